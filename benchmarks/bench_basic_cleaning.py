@@ -0,0 +1,57 @@
+"""
+Benchmarks the 'python' and 'arrow' engines of basic_cleaning and reports rows/second for each.
+
+Usage:
+    python -m benchmarks.bench_basic_cleaning --rows 100000 --repeats 3
+"""
+import argparse
+import random
+import time
+import pandas as pd
+from src.text_preprocessing import basic_cleaning
+
+WORDS = [
+    'The', 'suspect', 'entered', 'premises', 'at', '23:40', 'and', 'removed', 'a', 'laptop,', 'phone',
+    '(value', '£350)', 'Victim', 'reported', 'the', 'offence', 'to', 'police;', 'No', 'injuries!', 'vehicle',
+    'was', 'damaged', 'outside', 'No.', '14', 'High', 'Street.', 'Offender', 'known', 'victim.'
+    ]
+
+
+def make_corpus(rows: int, words_per_row: int = 60, seed: int = 42) -> pd.Series:
+    """Generates a deterministic Series of report-like strings."""
+
+    rng = random.Random(seed)
+    return pd.Series([' '.join(rng.choices(WORDS, k=words_per_row)) for _ in range(rows)])
+
+
+def time_engine(data: pd.Series, engine: str, repeats: int) -> float:
+    """Returns the best observed throughput (rows/second) of basic_cleaning over several repeats."""
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        basic_cleaning(data, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return len(data) / best
+
+
+def main(rows: int, repeats: int):
+    data = make_corpus(rows)
+
+    # Both engines must agree before their speed is compared
+    python_output = basic_cleaning(data, engine='python')
+    arrow_output = basic_cleaning(data, engine='arrow')
+    if python_output.tolist() != arrow_output.tolist():
+        raise AssertionError("The python and arrow engines produced different output.")
+
+    for engine in ('python', 'arrow'):
+        print(f"{engine:>6}: {time_engine(data, engine, repeats):,.0f} rows/second ({rows:,} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark basic_cleaning engines")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of synthetic rows.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of timed repeats per engine.")
+    args = parser.parse_args()
+
+    main(rows=args.rows, repeats=args.repeats)
@@ -0,0 +1,215 @@
+"""
+Times each stage of the preprocessing pipeline (load_data, data_preprocessing, target_mapping and text_cleaning)
+on synthetic corpora of increasing size, records the peak memory of each stage, and compares the results against
+a stored baseline.
+
+Usage:
+    python -m benchmarks.bench_pipeline --rows 10000 100000 1000000 --save-baseline
+    python -m benchmarks.bench_pipeline --rows 10000 100000 1000000
+
+The second command exits with status 1 if a stage is slower, or uses more memory, than the baseline allows, and
+with status 2 if there is no baseline for a benchmarked size and stage (so a missing baseline cannot pass silently).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+from benchmarks.corpus import generate_corpus, write_corpus
+from src.read_data import load_data
+from src.preprocessing import data_preprocessing
+from src.target_formatting import target_mapping
+from src.text_preprocessing import text_cleaning
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+FEATURES_NAME = 'text'
+TARGET_NAME = 'offence'
+# Stages faster than this (in seconds) are too noisy to flag as time regressions
+MIN_SECONDS = 0.05
+
+
+def setup_workspace(root: str):
+    """Creates the data and output directories under root, and a config.json pointing at them."""
+
+    for name in ('config', 'data', 'results', 'duplicates', 'outliers'):
+        os.makedirs(os.path.join(root, name))
+    config = {'input_data': os.path.join(root, 'data'),
+              'results': os.path.join(root, 'results'),
+              'label_remappings': os.path.join(root, 'remap.csv'),
+              'duplicate_data': os.path.join(root, 'duplicates'),
+              'duplicate_metadata': os.path.join(root, 'duplicates'),
+              'outliers': os.path.join(root, 'outliers'),
+              'target_name': TARGET_NAME,
+              'features_name': FEATURES_NAME}
+    with open(os.path.join(root, 'config', 'config.json'), 'w') as file:
+        json.dump(config, file, indent=4)
+
+
+def pipeline_stages(data_directory: str) -> list:
+    """Returns the pipeline stages as (name, function) pairs. Each function takes the previous stage's state."""
+
+    def read(state):
+        return {'data': load_data(data_directory, all_files=True, columns=[FEATURES_NAME, TARGET_NAME])}
+
+    def preprocess(state):
+        return {'data': data_preprocessing(state['data'], FEATURES_NAME)}
+
+    def map_target(state):
+        target = target_mapping(state['data'], TARGET_NAME, ignored_values=['Other'], remap_target=True)
+        return {**state, 'target': target}
+
+    def clean_text(state):
+        return {**state, 'text': text_cleaning(state['data'][FEATURES_NAME], id_values=state['target'].index)}
+
+    return [('load_data', read), ('data_preprocessing', preprocess),
+            ('target_mapping', map_target), ('text_cleaning', clean_text)]
+
+
+def output_rows(state: dict) -> int:
+    """Returns the number of rows produced by the most recent stage."""
+
+    for key in ('text', 'target', 'data'):
+        if key in state:
+            return len(state[key])
+    return 0
+
+
+def run_pipeline(data_directory: str, trace_memory: bool = False) -> dict:
+    """Runs the stages once and returns the seconds (or peak traced memory, in MB) and output rows of each."""
+
+    results = {}
+    state = {}
+    for name, stage in pipeline_stages(data_directory):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        state = stage(state)
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {'peak_mb': peak / 2 ** 20}
+        else:
+            results[name] = {'seconds': elapsed, 'rows_out': output_rows(state)}
+    return results
+
+
+def benchmark(root: str, rows: int, repeats: int = 1, measure_memory: bool = True, seed: int = 42) -> dict:
+    """
+    Benchmarks the pipeline on a synthetic corpus of the given size, written to the workspace at root.
+
+    Stages are timed without tracing (the best of repeats is kept); peak memory is measured in a separate run
+    with tracemalloc, whose overhead would otherwise distort the timings.
+    """
+
+    data_directory = os.path.join(root, 'data')
+    for file_name in os.listdir(data_directory):
+        os.remove(os.path.join(data_directory, file_name))
+    write_corpus(generate_corpus(rows, FEATURES_NAME, TARGET_NAME, seed=seed),
+                 data_directory, os.path.join(root, 'remap.csv'))
+
+    runs = [run_pipeline(data_directory) for _ in range(repeats)]
+    results = {name: {'seconds': min(run[name]['seconds'] for run in runs),
+                      'rows_out': runs[0][name]['rows_out']}
+               for name in runs[0]}
+    if measure_memory:
+        for name, memory in run_pipeline(data_directory, trace_memory=True).items():
+            results[name].update(memory)
+    return results
+
+
+def compare(current: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list:
+    """Prints each stage against the baseline and returns the regressions found."""
+
+    regressions = []
+    for rows, stages in current.items():
+        for name, result in stages.items():
+            reference = baseline.get(rows, {}).get(name)
+            line = f"{rows:>9} {name:<20} {result['seconds']:>9.3f}s"
+            if reference is not None:
+                time_ratio = result['seconds'] / reference['seconds']
+                line += f" (x{time_ratio:.2f})"
+                if time_ratio > 1 + time_tolerance and result['seconds'] > MIN_SECONDS:
+                    regressions.append(f"{name} at {rows} rows is {time_ratio:.2f}x slower than the baseline.")
+            if 'peak_mb' in result:
+                line += f"  {result['peak_mb']:>9.1f} MB"
+            if reference is not None and 'peak_mb' in result and 'peak_mb' in reference:
+                memory_ratio = result['peak_mb'] / max(reference['peak_mb'], 1e-9)
+                line += f" (x{memory_ratio:.2f})"
+                if memory_ratio > 1 + memory_tolerance:
+                    regressions.append(f"{name} at {rows} rows uses {memory_ratio:.2f}x the baseline peak memory.")
+            print(line)
+    return regressions
+
+
+def main(rows: list, repeats: int, baseline_path: str, save_baseline: bool, measure_memory: bool,
+         time_tolerance: float, memory_tolerance: float) -> int:
+    # The pipeline reads ./config/config.json, so the benchmarks run inside a temporary workspace
+    root = tempfile.mkdtemp(prefix='crimi_bench_')
+    working_directory = os.getcwd()
+    current = {}
+    try:
+        setup_workspace(root)
+        os.chdir(root)
+        for n_rows in rows:
+            print(f"Benchmarking {n_rows:,} rows...", flush=True)
+            current[str(n_rows)] = benchmark(root, n_rows, repeats=repeats, measure_memory=measure_memory)
+    finally:
+        os.chdir(working_directory)
+        shutil.rmtree(root, ignore_errors=True)
+
+    if save_baseline:
+        report = {'created': datetime.datetime.now().isoformat(),
+                  'python': platform.python_version(),
+                  'pandas': pd.__version__,
+                  'machine': platform.platform(),
+                  'results': current}
+        with open(baseline_path, 'w') as file:
+            json.dump(report, file, indent=4)
+        compare(current, {}, time_tolerance, memory_tolerance)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        compare(current, {}, time_tolerance, memory_tolerance)
+        print(f"ERROR: No baseline found at {baseline_path}. Run with --save-baseline on the reference machine "
+              "to create one.")
+        return 2
+
+    with open(baseline_path, 'r') as file:
+        baseline = json.load(file)['results']
+    regressions = compare(current, baseline, time_tolerance, memory_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    missing = [f"{name} at {rows} rows" for rows, stages in current.items() for name in stages
+               if name not in baseline.get(rows, {})]
+    for entry in missing:
+        print(f"ERROR: No baseline for {entry}. Run with --save-baseline to record it.")
+    if regressions:
+        return 1
+    return 2 if missing else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing pipeline stages")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Corpus sizes to benchmark.")
+    parser.add_argument("--repeats", type=int, default=1, help="Number of timed runs per size (the best is kept).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path of the baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory (tracemalloc) run.")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before failing (0.25 = 25%%).")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="Allowed peak memory increase against the baseline before failing (0.10 = 10%%).")
+    args = parser.parse_args()
+
+    sys.exit(main(rows=args.rows, repeats=args.repeats, baseline_path=args.baseline,
+                  save_baseline=args.save_baseline, measure_memory=not args.no_memory,
+                  time_tolerance=args.time_tolerance, memory_tolerance=args.memory_tolerance))
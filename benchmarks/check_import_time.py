@@ -0,0 +1,78 @@
+"""
+Checks that importing the entry point and the preprocessing modules stays fast and side-effect free.
+
+Each module is imported in a fresh interpreter with `python -X importtime`. The check fails if the cumulative
+import time (best of several runs) exceeds the module's budget, or if a module that should be loaded lazily
+(e.g. nltk or scikit-learn) is imported.
+
+Usage:
+    python -m benchmarks.check_import_time --repeats 5
+"""
+import argparse
+import subprocess
+import sys
+
+# Module -> (budget in milliseconds, modules that must not be imported)
+BUDGETS = {
+    'main': (150, ('pandas', 'numpy', 'scipy', 'sklearn', 'nltk', 'joblib', 'dotenv')),
+    'src.preprocessing': (1500, ('scipy', 'sklearn', 'nltk')),
+    'src.streaming_preprocessing': (1500, ('scipy', 'sklearn', 'nltk')),
+    'src.target_formatting': (1500, ('scipy', 'sklearn', 'nltk')),
+    'src.text_preprocessing': (1500, ('scipy', 'sklearn', 'nltk')),
+    'src.cleaning_cache': (1500, ('scipy', 'sklearn', 'nltk')),
+    }
+
+
+def import_profile(module: str) -> dict:
+    """Imports module in a fresh interpreter and returns the cumulative import time (microseconds) of each module."""
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def check_module(module: str, budget_ms: float, forbidden: tuple, repeats: int) -> list:
+    """Returns the budget violations of a module (an empty list if it passes)."""
+
+    profiles = [import_profile(module) for _ in range(repeats)]
+    best_ms = min(profile[module] for profile in profiles) / 1000
+    loaded = [name for name in forbidden if any(name in profile for profile in profiles)]
+
+    print(f"{module:<30} {best_ms:>8.1f} ms (budget {budget_ms} ms)")
+    failures = []
+    if best_ms > budget_ms:
+        failures.append(f"{module} took {best_ms:.1f} ms to import (budget {budget_ms} ms).")
+    if loaded:
+        failures.append(f"{module} imports {', '.join(loaded)} at import time.")
+    return failures
+
+
+def main(repeats: int, modules: list = None) -> int:
+    failures = []
+    for module in modules or BUDGETS:
+        budget_ms, forbidden = BUDGETS[module]
+        failures.extend(check_module(module, budget_ms, forbidden, repeats))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check import time budgets")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of imports per module (the best is kept).")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: all of {', '.join(BUDGETS)}).")
+    args = parser.parse_args()
+
+    sys.exit(main(repeats=args.repeats, modules=args.modules))
@@ -0,0 +1,124 @@
+"""
+Deterministic synthetic crime-report corpus used by the benchmarks.
+
+The corpus mimics the shape of the real input data: free-text reports with a long-tailed length distribution,
+punctuation, times, money amounts and addresses; a skewed distribution of raw offence labels that are remapped
+many-to-one (in the format of the label remapping CSV); exact duplicate reports; very long outlier reports; and
+missing text.
+"""
+import numpy as np
+import pandas as pd
+
+# Raw offence label -> (remapped label, share of reports, offence-specific vocabulary)
+OFFENCES = {
+    'Theft from person': ('theft', 0.14, ['stole', 'wallet', 'phone', 'bag', 'pickpocket', 'snatched']),
+    'Shoplifting': ('theft', 0.16, ['shop', 'store', 'security', 'items', 'concealed', 'tills']),
+    'Theft of vehicle': ('theft', 0.05, ['car', 'vehicle', 'keys', 'driven', 'registration', 'garage']),
+    'Common assault': ('violence', 0.13, ['punched', 'pushed', 'struck', 'fight', 'argument', 'bruising']),
+    'Assault with injury': ('violence', 0.09, ['injured', 'hospital', 'kicked', 'wound', 'blood', 'ambulance']),
+    'Burglary dwelling': ('burglary', 0.10, ['house', 'forced', 'window', 'entry', 'jewellery', 'ransacked']),
+    'Burglary business': ('burglary', 0.05, ['premises', 'office', 'alarm', 'shutter', 'safe', 'cctv']),
+    'Criminal damage': ('criminal damage', 0.10, ['damaged', 'smashed', 'graffiti', 'broken', 'scratched']),
+    'Fraud': ('fraud', 0.07, ['bank', 'card', 'online', 'transfer', 'account', 'scam']),
+    'Drug possession': ('drugs', 0.05, ['cannabis', 'searched', 'substance', 'wraps', 'possession']),
+    'Miscellaneous': ('Other', 0.04, ['incident', 'unknown', 'concern', 'neighbour', 'noise']),
+    'Not recorded': ('Other', 0.02, ['recorded', 'pending', 'review']),
+    }
+
+COMMON_WORDS = [
+    'the', 'suspect', 'victim', 'was', 'and', 'at', 'a', 'to', 'of', 'in', 'reported', 'police', 'officers',
+    'attended', 'male', 'female', 'aged', 'approximately', 'wearing', 'dark', 'clothing', 'street', 'road',
+    'outside', 'near', 'left', 'scene', 'towards', 'witness', 'stated', 'that', 'they', 'had', 'been', 'no',
+    'further', 'enquiries', 'offender', 'known', 'unknown', 'on', 'foot', 'after', 'before', 'with', 'by'
+    ]
+
+# Tokens with punctuation and digits, so the cleaning regex has work to do
+NOISY_WORDS = ['23:40', '£350', 'No.', '14', 'High', 'St.', 'victim,', 'scene.', '(male)', 'CCTV;', 'n/a', '07:15']
+
+MEAN_WORDS = 60
+
+
+def remapping_table() -> pd.DataFrame:
+    """Returns the label remapping table in the format of the label remapping CSV ('value, mapping')."""
+
+    return pd.DataFrame({'value': list(OFFENCES), ' mapping': [mapping for mapping, _, _ in OFFENCES.values()]})
+
+
+def generate_corpus(
+        rows: int,
+        features_name: str = 'text',
+        target_name: str = 'offence',
+        duplicate_rate: float = 0.05,
+        outlier_rate: float = 0.005,
+        missing_rate: float = 0.002,
+        seed: int = 42
+        ) -> pd.DataFrame:
+    """
+    Generates a deterministic synthetic corpus of crime reports.
+
+    Parameters:
+    - rows (int): The number of reports.
+    - features_name (str): The name of the text column.
+    - target_name (str): The name of the raw offence label column.
+    - duplicate_rate (float): The share of reports that exactly repeat an earlier report.
+    - outlier_rate (float): The share of reports that are far longer than usual (removed as length outliers).
+    - missing_rate (float): The share of reports with missing text.
+    - seed (int): The random seed. The same arguments always produce the same corpus.
+
+    Returns:
+    - pd.DataFrame: The reports, with an 'id' column, the text column and the raw label column.
+    """
+
+    rng = np.random.default_rng(seed)
+    labels = np.array(list(OFFENCES))
+    shares = np.array([share for _, share, _ in OFFENCES.values()])
+    label_codes = rng.choice(len(labels), size=rows, p=shares / shares.sum())
+
+    # Report lengths follow a long-tailed (log-normal) distribution; outliers are ten times longer
+    n_words = np.clip(rng.lognormal(np.log(MEAN_WORDS), 0.5, size=rows), 5, 400).astype(np.int64)
+    outliers = rng.random(rows) < outlier_rate
+    n_words[outliers] *= 10
+
+    # Words are drawn from the common, noisy and offence-specific vocabularies
+    vocabulary = np.array(COMMON_WORDS + NOISY_WORDS + [word for _, _, words in OFFENCES.values() for word in words])
+    offence_offsets = np.cumsum([len(COMMON_WORDS) + len(NOISY_WORDS)] +
+                                [len(words) for _, _, words in OFFENCES.values()])
+    offence_sizes = np.diff(offence_offsets)
+    row_of_word = np.repeat(np.arange(rows), n_words)
+    source = rng.random(len(row_of_word))
+    word_codes = rng.integers(0, len(COMMON_WORDS), size=len(row_of_word))
+    noisy = source < 0.08
+    word_codes[noisy] = len(COMMON_WORDS) + rng.integers(0, len(NOISY_WORDS), size=noisy.sum())
+    specific = source > 0.75
+    offence_of_word = label_codes[row_of_word[specific]]
+    word_codes[specific] = (offence_offsets[offence_of_word]
+                            + (rng.random(specific.sum()) * offence_sizes[offence_of_word]).astype(np.int64))
+    words = vocabulary[word_codes].tolist()
+
+    boundaries = np.concatenate([[0], np.cumsum(n_words)])
+    texts = [' '.join(words[start:end]) + '.' for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+    # Exact duplicates copy the text and label of an earlier report
+    duplicates = np.flatnonzero(rng.random(rows) < duplicate_rate)
+    duplicates = duplicates[duplicates > 0]
+    sources = (rng.random(len(duplicates)) * duplicates).astype(np.int64)
+    for row, source_row in zip(duplicates, sources):
+        texts[row] = texts[source_row]
+        label_codes[row] = label_codes[source_row]
+
+    data = pd.DataFrame({'id': np.arange(rows), features_name: texts, target_name: labels[label_codes]})
+    data.loc[rng.random(rows) < missing_rate, features_name] = np.nan
+    return data
+
+
+def write_corpus(
+        data: pd.DataFrame,
+        data_directory: str,
+        remapping_path: str,
+        n_files: int = 1
+        ):
+    """Writes a corpus to n_files CSV files in data_directory, and the label remapping table to remapping_path."""
+
+    for i, part in enumerate(np.array_split(np.arange(len(data)), n_files)):
+        data.iloc[part].to_csv(f"{data_directory}/reports_{i:03d}.csv", index=False)
+    remapping_table().to_csv(remapping_path, index=False)
@@ -1,54 +1,256 @@
 import argparse
+import datetime
 from src.config import update_config, load_config
-from src.read_data import load_data
-from src.preprocessing import data_preprocessing
-from src.target_formatting import target_mapping
-from src.text_preprocessing import text_cleaning
-from src.train_evaluate import training_and_eval_setup, train_and_evaluate
 
+# Stages recorded in the run report (see src.instrumentation)
+PIPELINE_STAGES = ['load_data', 'preprocessing', 'target_mapping', 'text_cleaning', 'vectorization', 'training',
+                   'final_model', 'compact_tradeoff']
+
+
+def load_and_preprocess(config, target_names, report, audit_sink, chunksize=None, near_duplicate_threshold=None):
+    """Reads the features and target columns and applies data_preprocessing (streamed when chunksize is given)."""
+
+    import pandas as pd
+    from src.read_data import load_data
+    from src.preprocessing import data_preprocessing
+    from src.streaming_preprocessing import streaming_data_preprocessing
+
+    # Read data from CSV file (lazily, chunk by chunk, when a chunksize is given)
+    input_data_path = config.input_data
+    if not input_data_path:
+        print("Input data path not configured.")
+    with report.stage('load_data') as stage:
+        data = load_data(
+            input_data_path,
+            all_files=True,
+            columns=[config.features_name, *target_names],
+            chunksize=chunksize
+            )
+        if chunksize is None:
+            stage['rows_out'] = len(data)
+
+    # Preprocessing (streamed chunk by chunk when a chunksize is given)
+    with report.stage('preprocessing', rows_in=None if chunksize else len(data)) as stage:
+        if chunksize is not None:
+            if near_duplicate_threshold is not None:
+                raise ValueError("Near-duplicate removal is not available when streaming chunks.")
+            data = pd.concat(streaming_data_preprocessing(
+                chunks=data,
+                features_name=config.features_name,
+                save_duplicates = True,
+                remove_outliers = True,
+                audit_sink = audit_sink
+                ))
+        else:
+            data = data_preprocessing(
+                data=data,
+                features_name=config.features_name,
+                save_duplicates = True,
+                remove_outliers = True,
+                near_duplicate_threshold = near_duplicate_threshold,
+                audit_sink = audit_sink
+                )
+        stage['rows_out'] = len(data)
+    return data
+
+
+def clean_text(config, data, id_values, report, text_cache=False, n_jobs=1):
+    """Cleans the features column of the rows in id_values (optionally reusing previously cleaned documents)."""
+
+    from src.text_preprocessing import text_cleaning
+    from src.cleaning_cache import CleanedTextCache, cached_text_cleaning
+
+    with report.stage('text_cleaning', rows_in=len(id_values)) as stage:
+        if text_cache:
+            text = cached_text_cleaning(
+                data = data[config.features_name],
+                cache = CleanedTextCache(f"{config.results}/cache"),
+                id_values = id_values,
+                n_jobs = n_jobs
+                )
+        else:
+            text = text_cleaning(
+                data = data[config.features_name],
+                id_values = id_values,
+                n_jobs = n_jobs
+                )
+        stage['rows_out'] = len(text)
+    return text
+
+
+def main(update=False, n_jobs=1, text_cache=False, near_duplicate_threshold=None, chunksize=None,
+         search='grid', halving_resource='n_samples', profile_stages=None, trace_memory=False,
+         audit_format='csv.gz', features='tfidf', compact=False):
+    # Heavy dependencies (pandas, nltk, scikit-learn) are imported here so that --help and the other
+    # subcommands start quickly
+    from src.target_formatting import target_mapping
+    from src.train_evaluate import training_and_eval_setup, train_and_evaluate, fit_vectorizer, fit_final_model, \
+        compact_tradeoff
+    from src.feature_store import FeatureMatrixStore
+    from src.feature_engineering import compact_vectorizer_params
+    from src.model_compaction import compact_pipeline
+    from src.inference import save_pipeline
+    from src.instrumentation import RunReport
+    from src.audit import AuditSink
 
-def main(update=False):
     if update:
         update_config(
             './config/config.template.json'
             )
     # Load config variables as dot notation
     config = load_config()
-    
-    # Read data from CSV file
-    input_data_path = config.input_data
-    if not input_data_path:
-        print("Input data path not configured.")
-    data = load_data(input_data_path)
 
-    # Preprocessing
-    data = data_preprocessing(
-        data=data,
-        features_name=config.features_name,
-        save_duplicates = True,
-        remove_outliers = True
+    # Record the cost of each stage in a run report
+    run_name = datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S')
+    report = RunReport(
+        trace_memory = trace_memory,
+        profile_stages = profile_stages,
+        profile_dir = f"{config.results}/profiles/{run_name}",
+        metadata = {'n_jobs': n_jobs, 'text_cache': text_cache, 'near_duplicate_threshold': near_duplicate_threshold,
+                    'chunksize': chunksize, 'search': search, 'halving_resource': halving_resource,
+                    'audit_format': audit_format, 'features': features, 'compact': compact}
         )
+    # Removed records are written for auditing in the background while the pipeline continues
+    audit_sink = AuditSink(format=audit_format)
 
-    # Map target values
-    target = target_mapping(
-        dataframe=data, 
-        target_name = config.target_name,
-        remap_target=True,
-        ignored_values = ['Other']
-        )
-    
-    # Clean text features
-    text = text_cleaning(
-        data = data[config.features_name],
-        id_values = target.index
-        )
-    
-    # Setup training environment
-    training_setup = training_and_eval_setup()
+    # The report is saved even if the run fails, with the stage that failed
+    try:
+        data = load_and_preprocess(config, [config.target_name], report, audit_sink, chunksize,
+                                   near_duplicate_threshold)
+        # Surface audit write errors that have already occurred, without waiting for the queued records
+        audit_sink.check()
+
+        # Map target values
+        with report.stage('target_mapping', rows_in=len(data)) as stage:
+            target = target_mapping(
+                dataframe=data, 
+                target_name = config.target_name,
+                remap_target=True,
+                ignored_values = ['Other'],
+                encode = True
+                )
+            stage['rows_out'] = len(target)
+
+        text = clean_text(config, data, target.index, report, text_cache, n_jobs)
+
+        # Setup training environment (optionally with a pruned, float32 TF-IDF vocabulary)
+        vectorizer_params = compact_vectorizer_params(text) if compact and features == 'tfidf' else None
+        training_setup = training_and_eval_setup(features = features,
+                                                 vectors_dir = f"{config.results}/vectors",
+                                                 vectorizer_params = vectorizer_params)
+
+        # Fit the vectorizer of the final pipeline on all documents. A sparse TF-IDF matrix stored by an earlier run
+        # on the same cleaned documents and vectorizer is reused (the most recent matrices are kept). Dense word
+        # vector features are small and stay dense, and their vectors are reused from vectors_dir instead.
+        with report.stage('vectorization', rows_in=len(text)) as stage:
+            if features == 'tfidf':
+                store = FeatureMatrixStore(f"{config.results}/features")
+                stored = store.get_or_build(texts = text, vectorizer = training_setup['vectorizer'])
+                store.prune(keep = [stored['version']], max_versions = 3)
+                final_features = (stored['vectorizer'], stored['matrix'])
+            else:
+                final_features = fit_vectorizer(X = text, setup = training_setup)
+                # Only the word vectors of the final pipeline are kept
+                final_features[0].prune_vectors()
+            stage['rows_out'], stage['n_features'] = final_features[1].shape
+
+        # Training and evaluation loop
+        with report.stage('training', rows_in=len(text)) as stage:
+            results = train_and_evaluate(X = text,
+                                         y = target,
+                                         setup = training_setup,
+                                         n_jobs = n_jobs,
+                                         search = search,
+                                         resource = halving_resource,
+                                         cache_dir = f"{config.results}/cache/folds")
+            stage['rows_out'] = len(results)
+        results.to_csv(f"{config.results}/{datetime.date.today()}_nested_cv_results.csv", index=False)
+
+        # Fit and persist the final pipeline for scoring new reports
+        with report.stage('final_model', rows_in=len(text)) as stage:
+            vectorizer, classifier, labels = fit_final_model(X = text,
+                                                             y = target,
+                                                             setup = training_setup,
+                                                             results = results,
+                                                             features = final_features)
+            if compact:
+                vectorizer, classifier = compact_pipeline(vectorizer, classifier)
+            save_pipeline(f"{config.results}/models/pipeline.joblib", vectorizer, classifier, labels = labels,
+                          compress = 3 if compact else 0)
+
+        # Compare the compact representation with the current one on a holdout split
+        if vectorizer_params:
+            with report.stage('compact_tradeoff', rows_in=len(text)) as stage:
+                tradeoff = compact_tradeoff(X = text, y = target, vectorizer_params = vectorizer_params)
+                stage['rows_out'] = len(tradeoff)
+            tradeoff.to_csv(f"{config.results}/{datetime.date.today()}_compact_tradeoff.csv", index=False)
+        audit_sink.close()
+    finally:
+        report.save(f"{config.results}/{run_name}_run_report.json")
+
+
+def sweep(targets, remap_targets=(), update=False, n_jobs=-1, text_cache=False, near_duplicate_threshold=None,
+          chunksize=None, search='grid', halving_resource='n_samples', audit_format='csv.gz'):
+    from src.sweep import sweep_targets
+    from src.instrumentation import RunReport
+    from src.audit import AuditSink
+
+    if update:
+        update_config(
+            './config/config.template.json'
+            )
+    config = load_config()
+
+    run_name = datetime.datetime.now().strftime('%Y-%m-%d_%H%M%S')
+    report = RunReport(metadata = {'targets': targets, 'remap_targets': list(remap_targets), 'n_jobs': n_jobs,
+                                   'text_cache': text_cache, 'near_duplicate_threshold': near_duplicate_threshold,
+                                   'chunksize': chunksize, 'search': search, 'halving_resource': halving_resource,
+                                   'audit_format': audit_format})
+    audit_sink = AuditSink(format=audit_format)
+    sweep_dir = f"{config.results}/sweeps/{run_name}"
+
+    # The report is saved even if the run fails, with the stage that failed
+    try:
+        # Load, preprocess and clean the corpus once for all targets
+        data = load_and_preprocess(config, targets, report, audit_sink, chunksize, near_duplicate_threshold)
+        audit_sink.check()
+        text = clean_text(config, data, data.index, report, text_cache, n_jobs)
+
+        # Map and train each target in its own worker process
+        with report.stage('sweep', rows_in=len(text)) as stage:
+            summary = sweep_targets(
+                data = data,
+                text = text,
+                targets = {target_name: {'remap_target': target_name in remap_targets, 'ignored_values': ['Other']}
+                           for target_name in targets},
+                results_dir = sweep_dir,
+                n_jobs = n_jobs,
+                search = search,
+                resource = halving_resource,
+                cache_dir = f"{config.results}/cache/folds"
+                )
+            stage['rows_out'] = len(summary)
+        summary.to_csv(f"{sweep_dir}/summary.csv", index=False)
+        audit_sink.close()
+    finally:
+        report.save(f"{sweep_dir}/run_report.json")
+    print(summary[['target', 'documents', 'classes', 'accuracy', 'f1']].to_string(index=False))
+
+
+def predict(model_path=None, input_path=None, output_path=None, id_column=None, chunksize=10_000):
+    from src.inference import predict_csv
 
-    # Training and evaluation loop
-    train_and_evaluate(X = text,
-                       y = target)
+    config = load_config()
+    stats = predict_csv(
+        pipeline_path = model_path or f"{config.results}/models/pipeline.joblib",
+        input_path = input_path,
+        output_path = output_path,
+        features_name = config.features_name,
+        id_column = id_column,
+        chunksize = chunksize
+        )
+    print(f"Scored {stats['documents']} documents in {stats['seconds']:.1f}s "
+          f"({stats['documents_per_second']:,.0f} documents/second).")
 
 
 if __name__ == "__main__":
@@ -58,6 +260,183 @@ if __name__ == "__main__":
         action="store_true", 
         help="Update the configuration file before running."
         )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used for text cleaning and training (-1 uses all cores)."
+        )
+    parser.add_argument(
+        "--text-cache",
+        action="store_true",
+        help="Reuse cleaned text from previous runs, cleaning only new or changed documents."
+        )
+    parser.add_argument(
+        "--near-duplicate-threshold",
+        type=float,
+        default=None,
+        help="Also remove near-duplicate reports whose estimated similarity reaches this threshold (0-1]."
+        )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Read and preprocess the input data in chunks of this many rows (bounds preprocessing memory)."
+        )
+    parser.add_argument(
+        "--search",
+        choices=["grid", "halving"],
+        default="grid",
+        help="Hyperparameter search: exhaustive grid search or successive halving over the same grid."
+        )
+    parser.add_argument(
+        "--halving-resource",
+        choices=["n_samples", "n_estimators"],
+        default="n_samples",
+        help="Budget grown at each successive halving rung: training rows or trees."
+        )
+    parser.add_argument(
+        "--profile-stage",
+        action="append",
+        choices=PIPELINE_STAGES,
+        default=None,
+        help="Run this stage under cProfile and save the profile to <results>/profiles (repeatable)."
+        )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also record the peak Python memory of each stage with tracemalloc in the run report (slower)."
+        )
+    parser.add_argument(
+        "--features",
+        choices=["tfidf", "word2vec", "fasttext"],
+        default="tfidf",
+        help="Document features: TF-IDF, or pooled Word2Vec/FastText word vectors trained on the cleaned reports."
+        )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Prune the TF-IDF vocabulary, store features as float32, save a compact compressed model and write a "
+             "report comparing it with the current representation."
+        )
+    parser.add_argument(
+        "--audit-format",
+        choices=["csv.gz", "parquet", "csv"],
+        default="csv.gz",
+        help="File format of the duplicates and outliers audit files, written in the background."
+        )
+    subparsers = parser.add_subparsers(dest="command")
+    predict_parser = subparsers.add_parser(
+        "predict",
+        help="Score a CSV file of reports with a trained pipeline."
+        )
+    predict_parser.add_argument("input", help="CSV file containing the reports to score.")
+    predict_parser.add_argument("output", help="CSV file the predictions are written to.")
+    predict_parser.add_argument(
+        "--model",
+        default=None,
+        help="Path of the trained pipeline (default: <results>/models/pipeline.joblib)."
+        )
+    predict_parser.add_argument(
+        "--id-column",
+        default=None,
+        help="Input column copied to the output to identify each report (default: row number)."
+        )
+    predict_parser.add_argument(
+        "--chunksize",
+        dest="predict_chunksize",
+        type=int,
+        default=10_000,
+        help="Number of reports scored at a time."
+        )
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Train a classifier for each of several targets, loading and cleaning the reports only once."
+        )
+    sweep_parser.add_argument("targets", nargs="+", help="Target columns to train classifiers for.")
+    sweep_parser.add_argument(
+        "--remap",
+        action="append",
+        default=[],
+        metavar="TARGET",
+        help="Remap this target's values with the label remappings file (repeatable)."
+        )
+    sweep_parser.add_argument(
+        "--n-jobs",
+        dest="sweep_n_jobs",
+        metavar="N_JOBS",
+        type=int,
+        default=-1,
+        help="Number of worker processes; targets are trained concurrently (default -1 uses all cores)."
+        )
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve a trained pipeline over HTTP on this machine, scoring requests in micro-batches."
+        )
+    serve_parser.add_argument(
+        "--model",
+        default=None,
+        help="Path of the trained pipeline (default: <results>/models/pipeline.joblib)."
+        )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost).")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to bind.")
+    serve_parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=64,
+        help="Maximum number of reports scored per micro-batch."
+        )
+    serve_parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=10.0,
+        help="Maximum time (milliseconds) to wait for a micro-batch to fill."
+        )
     args=parser.parse_args()
-    
-    main(update=args.update_config)
\ No newline at end of file
+
+    if args.command == "serve":
+        from src.inference_server import serve
+
+        serve(
+            pipeline_path=args.model or f"{load_config().results}/models/pipeline.joblib",
+            host=args.host,
+            port=args.port,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms
+            )
+    elif args.command == "sweep":
+        sweep(
+            targets=args.targets,
+            remap_targets=args.remap,
+            update=args.update_config,
+            n_jobs=args.sweep_n_jobs,
+            text_cache=args.text_cache,
+            near_duplicate_threshold=args.near_duplicate_threshold,
+            chunksize=args.chunksize,
+            search=args.search,
+            halving_resource=args.halving_resource,
+            audit_format=args.audit_format
+            )
+    elif args.command == "predict":
+        predict(
+            model_path=args.model,
+            input_path=args.input,
+            output_path=args.output,
+            id_column=args.id_column,
+            chunksize=args.predict_chunksize
+            )
+    else:
+        main(
+            update=args.update_config,
+            n_jobs=args.n_jobs,
+            text_cache=args.text_cache,
+            near_duplicate_threshold=args.near_duplicate_threshold,
+            chunksize=args.chunksize,
+            search=args.search,
+            halving_resource=args.halving_resource,
+            profile_stages=args.profile_stage,
+            trace_memory=args.trace_memory,
+            audit_format=args.audit_format,
+            features=args.features,
+            compact=args.compact
+            )
\ No newline at end of file
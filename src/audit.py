@@ -0,0 +1,153 @@
+import pandas as pd
+import atexit
+import logging
+import os
+import queue
+import threading
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+AUDIT_FORMATS = ('csv', 'csv.gz', 'parquet')
+
+
+class AuditSink:
+    """
+    Writes audit records (e.g. removed duplicates and outliers) on a background thread, so preprocessing does not
+    wait on disk I/O.
+
+    Records are queued with write and appended to their file in the order they were queued. The first write to a
+    path in a sink replaces any existing file and later writes append to it, so chunked input can be audited chunk
+    by chunk. The queue is bounded: if the writer falls behind by max_queue batches, write blocks until it catches
+    up, which bounds the memory held by pending records. Pending records are flushed by close, which is also
+    called at interpreter shutdown.
+
+    Parameters:
+    - format (str, optional): 'csv.gz' (gzip-compressed CSV, the default), 'parquet' (compressed columnar, via
+                              pyarrow) or 'csv' (uncompressed).
+    - max_queue (int, optional): The maximum number of batches waiting to be written. Default is 8.
+
+    Raises:
+    - ValueError: If format is not recognised.
+    """
+
+    def __init__(self, format: str = 'csv.gz', max_queue: int = 8):
+        if format not in AUDIT_FORMATS:
+            raise ValueError(f"format must be one of {AUDIT_FORMATS}.")
+        self.format = format
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._written = set()
+        self._parquet_writers = {}
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def path(self, path: str) -> str:
+        """Returns the file the records for path are written to (its extension follows the sink's format)."""
+
+        root, extension = os.path.splitext(path)
+        if self.format == 'csv':
+            return path
+        if self.format == 'csv.gz':
+            return f"{path}.gz" if extension == '.csv' else f"{root}.csv.gz"
+        return f"{root}.parquet"
+
+    def write(self, data: pd.DataFrame, path: str) -> str:
+        """
+        Queues records to be appended to the audit file for path, and returns the file they are written to.
+
+        Raises:
+        - ValueError: If the sink is closed.
+        - Exception: The error raised while writing an earlier batch (e.g. FileNotFoundError if its directory does
+                     not exist).
+        """
+
+        self.check()
+        if self._closed:
+            raise ValueError("The audit sink is closed.")
+        output_path = self.path(path)
+        self._queue.put((output_path, data))
+        return output_path
+
+    def check(self):
+        """
+        Raises the error of a failed write, if any, without waiting for queued records (see flush and close).
+
+        Raises:
+        - Exception: The error raised while writing a batch.
+        """
+
+        if self._error is not None:
+            raise self._error
+
+    def flush(self):
+        """
+        Waits until all queued records are written.
+
+        Raises:
+        - Exception: The error raised while writing a batch.
+        """
+
+        self._queue.join()
+        self.check()
+
+    def close(self):
+        """Writes the queued records, closes the audit files and stops the writer thread."""
+
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            atexit.unregister(self.close)
+        self.check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                if self._error is None:
+                    path, data = item
+                    try:
+                        self._write(path, data)
+                    except Exception as e:
+                        logging.error(f"Failed to save audit records to {path}. Error: {e!r}")
+                        self._error = e
+            finally:
+                self._queue.task_done()
+
+        for path, writer in self._parquet_writers.items():
+            try:
+                writer.close()
+            except Exception as e:
+                logging.error(f"Failed to close audit file {path}. Error: {e!r}")
+                self._error = self._error or e
+
+    def _write(self, path: str, data: pd.DataFrame):
+        append = path in self._written
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            writer = self._parquet_writers.get(path)
+            if writer is None:
+                # The file's schema is fixed by the first batch. Columns without any values in it (e.g. a target
+                # missing from a whole chunk) cannot be typed, so they are stored as strings.
+                schema = pa.schema([pa.field(field.name, pa.string()) if column.null_count == len(column) else field
+                                    for field, column in zip(table.schema, table.columns)])
+                writer = self._parquet_writers[path] = pq.ParquetWriter(path, schema, compression='zstd')
+            writer.write_table(table.cast(writer.schema))
+        else:
+            data.to_csv(path, index=False, mode='a' if append else 'w', header=not append,
+                        compression='gzip' if self.format == 'csv.gz' else None)
+        self._written.add(path)
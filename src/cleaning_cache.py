@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import logging
+import os
+import time
+from src.text_preprocessing import text_cleaning, get_stop_words, get_stemmer, PUNCTUATION_PATTERN
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def cleaning_fingerprint() -> str:
+    """
+    Returns a hash of the text cleaning configuration (stopword list, stemmer and punctuation regex). Cleaned text
+    produced under a different configuration is never reused.
+    """
+
+    import nltk
+
+    stemmer = get_stemmer()
+
+    config_hash = hashlib.blake2b(digest_size=16)
+    config_hash.update('\n'.join(sorted(get_stop_words())).encode('utf-8'))
+    config_hash.update(f"{type(stemmer).__module__}.{type(stemmer).__name__}".encode('utf-8'))
+    config_hash.update(f"nltk=={nltk.__version__}".encode('utf-8'))
+    config_hash.update(PUNCTUATION_PATTERN.pattern.encode('utf-8'))
+    return config_hash.hexdigest()
+
+
+class CleanedTextCache:
+    """
+    A persistent, content-addressed cache of cleaned text stored as a Parquet file.
+
+    Each entry is keyed by a hash of the raw document and the cleaning configuration. When saved, entries from
+    other configurations are evicted, followed by entries older than max_age_days and then the least recently
+    used entries above max_entries.
+
+    Parameters:
+    - cache_dir (str): The directory holding the cache file (created if missing).
+    - max_entries (int): The maximum number of cached documents.
+    - max_age_days (float, optional): Entries not used for this many days are evicted. Default keeps all entries.
+    """
+
+    file_name = 'cleaned_text.parquet'
+
+    def __init__(self, cache_dir: str, max_entries: int = 1_000_000, max_age_days: float = None):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries must be a positive integer.")
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, self.file_name)
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.fingerprint = cleaning_fingerprint()
+        self._entries = self._read()
+
+    def _read(self) -> pd.DataFrame:
+        """Reads the cache file, keeping only entries built with the current cleaning configuration."""
+
+        empty = pd.DataFrame({'key': pd.Series(dtype=object),
+                              'cleaned': pd.Series(dtype=object),
+                              'last_used': pd.Series(dtype='int64')}).set_index('key')
+        if not os.path.exists(self.path):
+            return empty
+
+        try:
+            entries = pd.read_parquet(self.path)
+        except Exception as e:
+            logging.error(f"Failed to read cleaned text cache at {self.path}. Starting empty. Error: {e}")
+            return empty
+
+        stale = entries['config'] != self.fingerprint
+        if stale.any():
+            logging.info(f"{stale.sum()} cached documents were built with another cleaning configuration.")
+        return entries.loc[~stale, ['key', 'cleaned', 'last_used']].set_index('key')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def hash_documents(self, data: pd.Series) -> pd.Series:
+        """Returns the cache key of each raw document, keyed by the cleaning configuration."""
+
+        key = self.fingerprint.encode('utf-8')
+        return pd.Series(
+            [hashlib.blake2b(text.encode('utf-8'), digest_size=16, key=key).hexdigest() for text in data],
+            index=data.index
+            )
+
+    def lookup(self, keys: pd.Series) -> pd.Series:
+        """Returns the cached cleaned text for each key (NaN where the key is not cached)."""
+
+        positions = self._entries.index.get_indexer(keys)
+        found = positions >= 0
+        cleaned = pd.Series(np.full(len(keys), np.nan, dtype=object), index=keys.index)
+        cleaned[found] = self._entries['cleaned'].to_numpy()[positions[found]]
+
+        # Refresh the last-used time of hit entries
+        last_used = self._entries['last_used'].to_numpy().copy()
+        last_used[positions[found]] = int(time.time())
+        self._entries['last_used'] = last_used
+        return cleaned
+
+    def update(self, keys: pd.Series, cleaned: pd.Series):
+        """Adds newly cleaned documents to the cache."""
+
+        new_entries = pd.DataFrame(
+            {'cleaned': cleaned.to_numpy(dtype=object), 'last_used': int(time.time())},
+            index=pd.Index(keys.to_numpy(), name='key')
+            )
+        entries = pd.concat([self._entries, new_entries])
+        self._entries = entries[~entries.index.duplicated(keep='last')]
+
+    def _evict(self):
+        """Evicts expired entries, then the least recently used entries above max_entries."""
+
+        size_before = len(self._entries)
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            self._entries = self._entries[self._entries['last_used'] >= cutoff]
+        if len(self._entries) > self.max_entries:
+            self._entries = self._entries.sort_values('last_used', kind='stable').iloc[-self.max_entries:]
+        evicted = size_before - len(self._entries)
+        if evicted:
+            logging.info(f"Evicted {evicted} entries from the cleaned text cache.")
+
+    def save(self):
+        """Applies the eviction policy and atomically writes the cache file."""
+
+        self._evict()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = self._entries.reset_index()
+        entries['config'] = self.fingerprint
+        tmp_path = f"{self.path}.tmp"
+        entries.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        logging.info(f"Saved {len(entries)} cleaned documents to {self.path}")
+
+
+def cached_text_cleaning(
+        data: pd.Series,
+        cache: CleanedTextCache,
+        id_values = None,
+        **cleaning_kwargs
+        ) -> pd.Series:
+    """
+    Cleans text with text_cleaning, reusing cleaned documents from a persistent cache. Only documents whose hash
+    is not in the cache are cleaned; the cache is then updated and saved.
+
+    Parameters:
+    - data (pd.Series): A pandas Series containing text values.
+    - cache (CleanedTextCache): The cache of previously cleaned documents.
+    - id_values: Index values corresponding to the rows to be processed (non-indexed values are removed).
+    - **cleaning_kwargs: Further keyword arguments passed to text_cleaning (e.g. n_jobs, engine).
+
+    Returns:
+    - data (pd.Series): A pandas Series containing cleaned text values, identical to text_cleaning's output.
+    """
+
+    if id_values is not None:
+        data = data.loc[id_values]
+
+    keys = cache.hash_documents(data)
+    cleaned = cache.lookup(keys)
+    missing = cleaned.isna().to_numpy()
+    logging.info(f"Cleaned text cache: {(~missing).sum()} hits, {missing.sum()} misses.")
+
+    if missing.any():
+        # Clean each new document once, even if it appears in several rows
+        missing_keys = keys[missing]
+        first = ~missing_keys.duplicated().to_numpy()
+        new_cleaned = text_cleaning(data[missing][first], **cleaning_kwargs)
+        cache.update(missing_keys[first], new_cleaned)
+
+        new_by_key = pd.Series(new_cleaned.to_numpy(dtype=object), index=missing_keys[first].to_numpy())
+        cleaned[missing] = new_by_key.loc[missing_keys.to_numpy()].to_numpy()
+
+    cache.save()
+    cleaned.name = data.name
+    return cleaned
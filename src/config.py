@@ -2,16 +2,17 @@ import json
 import os
 import logging
 import warnings
-from dotenv import load_dotenv
 
 # Config logging 
 logging.basicConfig(level=logging.INFO, filename='app.log', filemode='a',
                     format='%(name)s - %(levelname)s - %(message)s')
 
-# load environment variables from .env
-load_dotenv('./config/.env')
-
 def update_config(template_path):
+    from dotenv import load_dotenv
+
+    # load environment variables from .env
+    load_dotenv('./config/.env')
+
     # load the template config
     with open(template_path, 'r') as file:
         config_template = json.load(file)
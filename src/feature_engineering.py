@@ -1,2 +1,359 @@
-def create_feature_vector():
-    return None
\ No newline at end of file
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Iterable
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class StreamingFeatureExtractor(BaseEstimator, TransformerMixin):
+    """
+    A stateless, fixed-width text feature extractor based on feature hashing, with optional TF-IDF weighting.
+
+    Tokens are hashed into n_features columns, so no vocabulary is held in memory and any chunk can be transformed
+    independently. When use_idf is True, document frequencies are accumulated chunk by chunk with partial_fit
+    (and can be merged across extractors), and the IDF weights match TfidfVectorizer's smoothed IDF.
+
+    Parameters:
+    - n_features (int): The number of output columns (hash buckets).
+    - use_idf (bool): If True, weights term counts by inverse document frequency.
+    - sublinear_tf (bool): If True, replaces term counts with 1 + log(count).
+    - norm (str): The row normalisation ('l1', 'l2' or None).
+    - token_pattern (str): The regex defining a token (TfidfVectorizer's default).
+    - dtype: The dtype of the output matrix.
+    """
+
+    def __init__(self,
+                 n_features: int = 2 ** 20,
+                 use_idf: bool = True,
+                 sublinear_tf: bool = False,
+                 norm: str = 'l2',
+                 token_pattern: str = r"(?u)\b\w\w+\b",
+                 dtype=np.float64):
+        self.n_features = n_features
+        self.use_idf = use_idf
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self.token_pattern = token_pattern
+        self.dtype = dtype
+
+    def _hasher(self) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=self.n_features,
+            token_pattern=self.token_pattern,
+            alternate_sign=False,
+            norm=None,
+            dtype=self.dtype
+            )
+
+    def count(self, data: Iterable[str]) -> sparse.csr_matrix:
+        """Returns the hashed term counts of each document."""
+
+        return self._hasher().transform(data)
+
+    def partial_fit(self, data: Iterable[str], y=None):
+        """Accumulates document frequencies from a chunk of documents."""
+
+        if not hasattr(self, 'document_frequency_'):
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+            self.n_documents_ = 0
+        counts = self.count(data)
+        self.document_frequency_ += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents_ += counts.shape[0]
+        return self
+
+    def fit(self, data: Iterable[str], y=None):
+        """Resets the document frequencies and accumulates them from data."""
+
+        for attribute in ('document_frequency_', 'n_documents_'):
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+        return self.partial_fit(data)
+
+    def merge(self, other: 'StreamingFeatureExtractor'):
+        """Adds the document frequencies accumulated by another extractor (e.g. on another worker)."""
+
+        if other.n_features != self.n_features:
+            raise ValueError("Extractors must have the same n_features to be merged.")
+        if not hasattr(self, 'document_frequency_'):
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+            self.n_documents_ = 0
+        self.document_frequency_ += other.document_frequency_
+        self.n_documents_ += other.n_documents_
+        return self
+
+    @property
+    def idf_(self) -> np.ndarray:
+        """The smoothed inverse document frequency of each column."""
+
+        return np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1
+
+    def transform(self, data: Iterable[str]) -> sparse.csr_matrix:
+        """
+        Transforms documents into a (n_documents, n_features) sparse matrix.
+
+        Raises:
+        - ValueError: If use_idf is True and no document frequencies have been accumulated.
+        """
+
+        features = self.count(data)
+        if self.sublinear_tf:
+            np.log(features.data, features.data)
+            features.data += 1
+        if self.use_idf:
+            if not hasattr(self, 'document_frequency_'):
+                raise ValueError("use_idf is True but the extractor has not been fitted. Call fit or partial_fit.")
+            features = features @ sparse.diags(self.idf_.astype(self.dtype))
+        if self.norm is not None:
+            features = normalize(features, norm=self.norm, copy=False)
+        return features.tocsr()
+
+
+def compact_vectorizer_params(
+        data: Iterable[str],
+        coverage: float = 0.99,
+        min_df: int = 2,
+        max_df: float = 0.95
+        ) -> dict:
+    """
+    Chooses TfidfVectorizer parameters for a compact vocabulary from the term counts of a corpus. Terms appearing
+    in fewer than min_df documents or in more than max_df of them are removed. max_features is then the smallest
+    number of the most frequent remaining terms that covers the given proportion of their occurrences. Features
+    are float32.
+
+    Parameters:
+    - data (Iterable[str]): The cleaned documents.
+    - coverage (float): The proportion (0-1] of term occurrences the kept vocabulary must cover.
+    - min_df (int): The minimum number of documents a term must appear in.
+    - max_df (float): The maximum proportion of documents a term may appear in.
+
+    Returns:
+    - dict: Keyword arguments for TfidfVectorizer (min_df, max_df, max_features and dtype).
+
+    Raises:
+    - ValueError: If coverage is not within (0, 1].
+    """
+
+    if not 0 < coverage <= 1:
+        error_message = "coverage must be within (0, 1]."
+        logging.error(error_message)
+        raise ValueError(error_message)
+
+    counter = CountVectorizer(min_df=min_df, max_df=max_df, dtype=np.int32)
+    counts = counter.fit_transform(data)
+    term_counts = np.sort(np.asarray(counts.sum(axis=0)).ravel())[::-1]
+    cumulative = np.cumsum(term_counts) / term_counts.sum()
+    max_features = int(min(np.searchsorted(cumulative, coverage) + 1, len(term_counts)))
+    logging.info(f"Compact vocabulary: {max_features} of {len(term_counts) + len(counter.stop_words_)} terms "
+                 f"({len(counter.stop_words_)} removed by document frequency, {coverage:.0%} coverage).")
+    return {'min_df': min_df, 'max_df': max_df, 'max_features': max_features, 'dtype': np.float32}
+
+
+class EmbeddingFeatureExtractor(BaseEstimator, TransformerMixin):
+    """
+    A dense document feature extractor based on word embeddings (gensim Word2Vec or FastText), usable in place of
+    the TF-IDF vectorizer.
+
+    fit trains word vectors on the (cleaned, space-separated) documents. If vectors_dir is given, the vectors are
+    saved there under a hash of the documents and parameters, and memory-mapped read-only when used: a later fit
+    on the same documents reuses them, and parallel workers share a single copy through the page cache (the
+    vectors are not pickled with the extractor, only their path).
+
+    transform pools the vectors of each document's tokens in batches: the token counts of a batch are built as a
+    sparse (documents x vocabulary) matrix, so mean pooling is one sparse-dense product and max pooling is a single
+    np.maximum.reduceat over the batch's token vectors. Tokens without a vector (e.g. below min_count) are ignored,
+    and documents without any known token get a zero vector.
+
+    Parameters:
+    - model (str): 'word2vec' or 'fasttext'.
+    - vector_size (int): The dimension of the word vectors (and of the document features).
+    - window (int): The maximum distance between a word and its context words.
+    - min_count (int): Words occurring fewer times are not given a vector.
+    - epochs (int): The number of training passes over the documents.
+    - pooling (str): How token vectors are combined into a document vector, 'mean' or 'max'.
+    - vectors_dir (str, optional): The directory the trained vectors are saved to and memory-mapped from. Default
+                                   keeps them in memory.
+    - batch_size (int): The number of documents pooled at a time.
+    - workers (int): The number of gensim training threads (1 makes training reproducible with seed).
+    - seed (int): The random seed used in training.
+    """
+
+    def __init__(self,
+                 model: str = 'word2vec',
+                 vector_size: int = 100,
+                 window: int = 5,
+                 min_count: int = 2,
+                 epochs: int = 5,
+                 pooling: str = 'mean',
+                 vectors_dir: str = None,
+                 batch_size: int = 10_000,
+                 workers: int = 1,
+                 seed: int = 42):
+        self.model = model
+        self.vector_size = vector_size
+        self.window = window
+        self.min_count = min_count
+        self.epochs = epochs
+        self.pooling = pooling
+        self.vectors_dir = vectors_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.seed = seed
+
+    def _version(self, data: list) -> str:
+        """Returns a hash of the documents and the training parameters."""
+
+        version_hash = hashlib.blake2b(digest_size=16)
+        params = {key: value for key, value in self.get_params().items()
+                  if key not in ('pooling', 'vectors_dir', 'batch_size')}
+        version_hash.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        for document in data:
+            version_hash.update(document.encode('utf-8'))
+            version_hash.update(b'\0')
+        return version_hash.hexdigest()
+
+    def _train(self, data: list):
+        """Trains word vectors on the documents and returns the KeyedVectors."""
+
+        from gensim.models import FastText, Word2Vec
+
+        models = {'word2vec': Word2Vec, 'fasttext': FastText}
+        model = models[self.model](
+            sentences=[document.split() for document in data],
+            vector_size=self.vector_size,
+            window=self.window,
+            min_count=self.min_count,
+            epochs=self.epochs,
+            workers=self.workers,
+            seed=self.seed
+            )
+        logging.info(f"Trained {self.model} vectors for {len(model.wv)} words on {len(data)} documents.")
+        return model.wv
+
+    def fit(self, data: Iterable[str], y=None):
+        """
+        Trains the word vectors on data (or reuses vectors saved for the same documents in vectors_dir).
+
+        Raises:
+        - ValueError: If model or pooling are not recognised.
+        """
+
+        if self.model not in ('word2vec', 'fasttext'):
+            raise ValueError("model must be either 'word2vec' or 'fasttext'.")
+        if self.pooling not in ('mean', 'max'):
+            raise ValueError("pooling must be either 'mean' or 'max'.")
+
+        data = list(data)
+        self.__dict__.pop('vectors_', None)
+        if self.vectors_dir is None:
+            self.vectors_path_ = None
+            self.vectors_ = self._train(data)
+            return self
+
+        directory = os.path.join(self.vectors_dir, self._version(data))
+        self.vectors_path_ = os.path.join(directory, 'vectors.kv')
+        if os.path.exists(self.vectors_path_):
+            logging.info(f"Reusing word vectors saved at {self.vectors_path_}")
+        else:
+            # Written to a temporary directory that is renamed once complete. Arrays are saved as separate .npy
+            # files so they can be memory-mapped.
+            tmp_directory = f"{directory}.tmp{os.getpid()}"
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            os.makedirs(tmp_directory)
+            self._train(data).save(os.path.join(tmp_directory, 'vectors.kv'), sep_limit=0)
+            try:
+                os.replace(tmp_directory, directory)
+            except OSError:
+                # Saved concurrently by another worker
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+        return self
+
+    def prune_vectors(self):
+        """Removes the vector sets saved in vectors_dir other than this extractor's (e.g. from earlier runs)."""
+
+        if getattr(self, 'vectors_path_', None) is None or not os.path.isdir(self.vectors_dir):
+            return
+        keep = os.path.basename(os.path.dirname(self.vectors_path_))
+        for version in os.listdir(self.vectors_dir):
+            if version != keep:
+                shutil.rmtree(os.path.join(self.vectors_dir, version), ignore_errors=True)
+                logging.info(f"Removed stale word vectors {version}")
+
+    def keyed_vectors(self):
+        """Returns the trained KeyedVectors (memory-mapped read-only if they were saved to vectors_dir)."""
+
+        if 'vectors_' not in self.__dict__:
+            if getattr(self, 'vectors_path_', None) is None:
+                raise ValueError("The extractor has not been fitted. Call fit first.")
+            from gensim.models import KeyedVectors
+
+            self.vectors_ = KeyedVectors.load(self.vectors_path_, mmap='r')
+        return self.vectors_
+
+    def __getstate__(self):
+        # Saved vectors are reloaded (memory-mapped) from vectors_path_ rather than pickled
+        state = super().__getstate__()
+        if state.get('vectors_path_') is not None:
+            state.pop('vectors_', None)
+        return state
+
+    def transform(self, data: Iterable[str]) -> np.ndarray:
+        """
+        Transforms documents into a dense (n_documents, vector_size) array of pooled word vectors.
+
+        Raises:
+        - ValueError: If the extractor has not been fitted.
+        """
+
+        keyed_vectors = self.keyed_vectors()
+        vectors = keyed_vectors.vectors
+        counter = CountVectorizer(vocabulary=keyed_vectors.key_to_index, token_pattern=r"(?u)\S+",
+                                  lowercase=False, dtype=vectors.dtype)
+
+        data = list(data)
+        features = np.zeros((len(data), vectors.shape[1]), dtype=vectors.dtype)
+        for start in range(0, len(data), self.batch_size):
+            counts = counter.transform(data[start:start + self.batch_size])
+            if self.pooling == 'mean':
+                n_tokens = np.asarray(counts.sum(axis=1)).ravel()
+                pooled = np.asarray(counts @ vectors)
+                np.divide(pooled, n_tokens[:, None], out=pooled, where=n_tokens[:, None] > 0)
+            else:
+                pooled = np.zeros((counts.shape[0], vectors.shape[1]), dtype=vectors.dtype)
+                non_empty = np.diff(counts.indptr) > 0
+                if non_empty.any():
+                    pooled[non_empty] = np.maximum.reduceat(
+                        vectors[counts.indices], counts.indptr[:-1][non_empty], axis=0
+                        )
+            features[start:start + counts.shape[0]] = pooled
+        return features
+
+
+def create_feature_vector(
+        data: pd.Series,
+        extractor: StreamingFeatureExtractor = None
+        ) -> sparse.csr_matrix:
+    """
+    Creates hashed (optionally TF-IDF weighted) feature vectors from cleaned text.
+
+    Parameters:
+    - data (pd.Series): A pandas Series containing cleaned text values.
+    - extractor (StreamingFeatureExtractor, optional): The extractor to use. If not provided, a new extractor is
+                                                       fitted on data.
+
+    Returns:
+    - sparse.csr_matrix: A sparse matrix with one row per document.
+    """
+
+    if extractor is None:
+        extractor = StreamingFeatureExtractor().fit(data)
+    return extractor.transform(data)
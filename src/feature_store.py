@@ -0,0 +1,179 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import logging
+import os
+import shutil
+import datetime
+import joblib
+from scipy import sparse
+from sklearn.base import clone
+from src.cleaning_cache import cleaning_fingerprint
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def feature_matrix_version(texts: pd.Series, vectorizer) -> str:
+    """
+    Returns the version key of a feature matrix: a hash of the cleaning configuration, the vectorizer's class and
+    parameters, and the cleaned texts and their index. A matrix is only reused when all of these match.
+    """
+
+    version_hash = hashlib.blake2b(digest_size=16)
+    version_hash.update(cleaning_fingerprint().encode('utf-8'))
+    vectorizer_config = {'class': f"{type(vectorizer).__module__}.{type(vectorizer).__name__}",
+                         'params': vectorizer.get_params()}
+    version_hash.update(json.dumps(vectorizer_config, sort_keys=True, default=repr).encode('utf-8'))
+    version_hash.update(pd.util.hash_pandas_object(texts, index=True).to_numpy().tobytes())
+    return version_hash.hexdigest()
+
+
+class FeatureMatrixStore:
+    """
+    An on-disk store of sparse feature matrices, written as raw CSR arrays (data, indices, indptr) with the
+    vectorizer's vocabulary and IDF vector, and the fitted vectorizer itself.
+
+    Stored matrices are memory-mapped read-only when loaded, so later runs and parallel workers share a single
+    copy through the page cache instead of recomputing the matrix or pickling it to each worker. Each matrix is
+    stored under its version key (see feature_matrix_version), so stale matrices are never reused.
+
+    Parameters:
+    - root (str): The directory holding the stored matrices (created if missing).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def exists(self, version: str) -> bool:
+        """Returns True if a complete matrix is stored under version."""
+
+        return os.path.exists(os.path.join(self._path(version), 'manifest.json'))
+
+    def save(self, version: str, matrix: sparse.spmatrix, index: pd.Index, vectorizer=None):
+        """
+        Writes a matrix (and the fitted vectorizer, with its vocabulary and IDF vector, if any) under version. The
+        files are written to a temporary directory that is renamed once complete.
+        """
+
+        matrix = sparse.csr_matrix(matrix)
+        tmp_path = f"{self._path(version)}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        for name in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(matrix, name))
+        pd.Series(index, dtype=index.dtype).to_pickle(os.path.join(tmp_path, 'index.pkl'))
+        if getattr(vectorizer, 'vocabulary_', None) is not None:
+            with open(os.path.join(tmp_path, 'vocabulary.json'), 'w') as file:
+                json.dump({term: int(column) for term, column in vectorizer.vocabulary_.items()}, file)
+        if getattr(vectorizer, 'idf_', None) is not None:
+            np.save(os.path.join(tmp_path, 'idf.npy'), np.asarray(vectorizer.idf_))
+        if vectorizer is not None:
+            joblib.dump(vectorizer, os.path.join(tmp_path, 'vectorizer.joblib'))
+
+        manifest = {'version': version,
+                    'shape': list(matrix.shape),
+                    'dtype': str(matrix.dtype),
+                    'vectorizer': type(vectorizer).__name__ if vectorizer is not None else None,
+                    'created': datetime.datetime.now().isoformat()}
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as file:
+            json.dump(manifest, file, indent=4)
+
+        shutil.rmtree(self._path(version), ignore_errors=True)
+        os.replace(tmp_path, self._path(version))
+        logging.info(f"Saved feature matrix {version} with shape {matrix.shape} to {self.root}")
+
+    def load(self, version: str) -> dict:
+        """
+        Memory-maps a stored matrix without copying it.
+
+        Returns:
+        - dict: 'matrix' (read-only CSR matrix backed by memory-mapped arrays), 'index' (pd.Index of the rows),
+                'vocabulary' (dict or None), 'idf' (memory-mapped array or None), 'vectorizer' (the fitted
+                vectorizer or None) and 'manifest'.
+
+        Raises:
+        - FileNotFoundError: If no matrix is stored under version.
+        """
+
+        path = self._path(version)
+        if not self.exists(version):
+            error_message = f"No feature matrix stored for version {version} at {self.root}"
+            logging.error(error_message)
+            raise FileNotFoundError(error_message)
+
+        with open(os.path.join(path, 'manifest.json'), 'r') as file:
+            manifest = json.load(file)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+                  for name in ('data', 'indices', 'indptr')}
+        matrix = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(manifest['shape']), copy=False
+            )
+
+        vocabulary = None
+        if os.path.exists(os.path.join(path, 'vocabulary.json')):
+            with open(os.path.join(path, 'vocabulary.json'), 'r') as file:
+                vocabulary = json.load(file)
+        idf_path = os.path.join(path, 'idf.npy')
+        idf = np.load(idf_path, mmap_mode='r') if os.path.exists(idf_path) else None
+        vectorizer_path = os.path.join(path, 'vectorizer.joblib')
+        vectorizer = joblib.load(vectorizer_path) if os.path.exists(vectorizer_path) else None
+
+        return {'matrix': matrix,
+                'index': pd.Index(pd.read_pickle(os.path.join(path, 'index.pkl'))),
+                'vocabulary': vocabulary,
+                'idf': idf,
+                'vectorizer': vectorizer,
+                'manifest': manifest}
+
+    def get_or_build(self, texts: pd.Series, vectorizer) -> dict:
+        """
+        Loads the matrix for texts and vectorizer if it is stored, otherwise fits a copy of the vectorizer, stores
+        the matrix and loads it memory-mapped.
+
+        Parameters:
+        - texts (pd.Series): A pandas Series containing cleaned text values.
+        - vectorizer: An unfitted vectorizer (e.g. TfidfVectorizer). It is not modified.
+
+        Returns:
+        - dict: As returned by load (with the fitted vectorizer), plus 'version'.
+        """
+
+        version = feature_matrix_version(texts, vectorizer)
+        if self.exists(version) and os.path.exists(os.path.join(self._path(version), 'vectorizer.joblib')):
+            logging.info(f"Reusing stored feature matrix {version}")
+        else:
+            vectorizer = clone(vectorizer)
+            matrix = vectorizer.fit_transform(texts.to_numpy(dtype=object))
+            self.save(version, matrix, texts.index, vectorizer)
+        return {**self.load(version), 'version': version}
+
+    def prune(self, keep: list, max_versions: int = None):
+        """
+        Removes stored matrices whose version is not in keep. Matrices being written (by a concurrent run) are left
+        alone.
+
+        Parameters:
+        - keep (list): The versions to keep.
+        - max_versions (int, optional): Also keep the most recently stored matrices, up to max_versions in total,
+                                        so that concurrent runs on other data do not remove each other's matrix.
+        """
+
+        if not os.path.isdir(self.root):
+            return
+        versions = [version for version in os.listdir(self.root) if self.exists(version)]
+        versions.sort(key=lambda version: os.path.getmtime(os.path.join(self._path(version), 'manifest.json')),
+                      reverse=True)
+        keep = set(keep)
+        for version in versions:
+            if max_versions is not None and len(keep) < max_versions:
+                keep.add(version)
+        for version in versions:
+            if version not in keep:
+                shutil.rmtree(self._path(version), ignore_errors=True)
+                logging.info(f"Removed stale feature matrix {version}")
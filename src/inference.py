@@ -0,0 +1,163 @@
+import pandas as pd
+import numpy as np
+import logging
+import os
+import time
+import datetime
+import warnings
+import joblib
+from src.text_preprocessing import text_cleaning
+from src.cleaning_cache import cleaning_fingerprint
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def save_pipeline(
+        path: str,
+        vectorizer,
+        classifier,
+        labels: np.ndarray = None,
+        cleaning_options: dict = None,
+        compress: int = 0
+        ):
+    """
+    Saves a trained pipeline (text cleaning options, fitted vectorizer and classifier) to a single file.
+
+    Parameters:
+    - path (str): The file path of the pipeline (its directory is created if missing).
+    - vectorizer: The fitted vectorizer.
+    - classifier: The fitted classifier.
+    - labels (np.ndarray, optional): The label names of the classifier's classes_ when it was trained on integer
+                                     codes (as returned by fit_final_model). Default predicts classes_ as they are.
+    - cleaning_options (dict, optional): Keyword arguments passed to text_cleaning when scoring (e.g. engine).
+    - compress (int, optional): The joblib compression level (0-9). Default (0) saves uncompressed.
+    """
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    pipeline = {
+        'vectorizer': vectorizer,
+        'classifier': classifier,
+        'labels': labels,
+        'cleaning_options': cleaning_options or {},
+        'cleaning_fingerprint': cleaning_fingerprint(),
+        'created': datetime.datetime.now().isoformat()
+    }
+    joblib.dump(pipeline, path, compress=compress)
+    logging.info(f"Pipeline saved to {path}")
+
+
+def load_pipeline(path: str) -> dict:
+    """
+    Loads a pipeline saved by save_pipeline. A warning is issued if the text cleaning configuration (stopwords,
+    stemmer, regex) differs from the one used in training.
+
+    Raises:
+    - FileNotFoundError: If no pipeline exists at path.
+    """
+
+    if not os.path.exists(path):
+        error_message = f"Pipeline not found at: {path}"
+        logging.error(error_message)
+        raise FileNotFoundError(error_message)
+
+    pipeline = joblib.load(path)
+    if pipeline.get('cleaning_fingerprint') != cleaning_fingerprint():
+        warnings.warn("The text cleaning configuration differs from the one the pipeline was trained with.")
+    return pipeline
+
+
+def predict_texts(
+        pipeline: dict,
+        texts: pd.Series
+        ) -> pd.DataFrame:
+    """
+    Cleans, vectorizes and classifies raw texts.
+
+    Parameters:
+    - pipeline (dict): A pipeline returned by load_pipeline.
+    - texts (pd.Series): A pandas Series containing raw text values (missing values are treated as empty text).
+
+    Returns:
+    - pd.DataFrame: The predicted class ('prediction') and the probability of each class ('proba_<class>'),
+                    indexed like texts.
+    """
+
+    cleaned = text_cleaning(texts.fillna('').astype(str), **pipeline['cleaning_options'])
+    features = pipeline['vectorizer'].transform(cleaned)
+    classifier = pipeline['classifier']
+
+    # Classifiers trained on label codes are decoded with the pipeline's label table
+    classes = classifier.classes_
+    if pipeline.get('labels') is not None:
+        classes = np.asarray(pipeline['labels'])[classes]
+
+    probabilities = classifier.predict_proba(features)
+    predictions = classes[np.argmax(probabilities, axis=1)]
+    columns = {'prediction': predictions}
+    columns.update({f"proba_{label}": probabilities[:, i] for i, label in enumerate(classes)})
+    return pd.DataFrame(columns, index=texts.index)
+
+
+def predict_csv(
+        pipeline_path: str,
+        input_path: str,
+        output_path: str,
+        features_name: str,
+        id_column: str = None,
+        chunksize: int = 10_000
+        ) -> dict:
+    """
+    Scores a CSV file of reports in chunks and writes predictions incrementally, so memory use is bounded by
+    the chunk size.
+
+    Parameters:
+    - pipeline_path (str): The path of a pipeline saved by save_pipeline.
+    - input_path (str): The CSV file to score.
+    - output_path (str): The CSV file the predictions and class probabilities are written to.
+    - features_name (str): The name of the text column in the input file.
+    - id_column (str, optional): An input column copied to the output to identify each report. Default writes the
+                                 row number instead.
+    - chunksize (int, optional): The number of rows scored at a time.
+
+    Returns:
+    - dict: The number of documents scored, the elapsed seconds and the throughput (documents/second).
+
+    Raises:
+    - FileNotFoundError: If the pipeline or input file do not exist.
+    - KeyError: If features_name (or id_column) is not a column of the input file.
+    """
+
+    if not os.path.exists(input_path):
+        error_message = f"File not found at: {input_path}"
+        logging.error(error_message)
+        raise FileNotFoundError(error_message)
+
+    pipeline = load_pipeline(pipeline_path)
+    columns = [features_name] if id_column is None else [features_name, id_column]
+    header_columns = pd.read_csv(input_path, nrows=0).columns
+    missing = [column for column in columns if column not in header_columns]
+    if missing:
+        error_message = f"{missing} not found in the columns of {input_path}."
+        logging.error(error_message)
+        raise KeyError(error_message)
+
+    start = time.perf_counter()
+    n_documents = 0
+    for i, chunk in enumerate(pd.read_csv(input_path, usecols=columns, chunksize=chunksize)):
+        predictions = predict_texts(pipeline, chunk[features_name])
+        identifiers = chunk[id_column] if id_column is not None else pd.Series(chunk.index, name='row')
+        predictions.insert(0, identifiers.name, identifiers.to_numpy())
+        predictions.to_csv(output_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+        n_documents += len(chunk)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Scored {n_documents} documents ({n_documents / elapsed:,.0f} documents/second)")
+
+    elapsed = time.perf_counter() - start
+    throughput = n_documents / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Predictions for {n_documents} documents written to {output_path} "
+                 f"({throughput:,.0f} documents/second)")
+    return {'documents': n_documents, 'seconds': elapsed, 'documents_per_second': throughput}
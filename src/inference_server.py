@@ -0,0 +1,283 @@
+import pandas as pd
+import numpy as np
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Callable, List
+from src.inference import load_pipeline, predict_texts
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    """
+    Groups concurrent prediction requests into micro-batches.
+
+    Texts submitted concurrently are queued, and a single worker takes up to max_batch_size of them. It waits at
+    most max_wait_ms after the first text for the batch to fill. Each batch is then scored with one call to
+    predict_fn in a worker thread, so vectorization and predict_proba run on batches rather than single strings.
+
+    Parameters:
+    - predict_fn (Callable): A function mapping a list of texts to a list of results (one per text).
+    - max_batch_size (int): The maximum number of texts per batch.
+    - max_wait_ms (float): The maximum time to wait for a batch to fill, in milliseconds.
+    - latency_window (int): The number of recent request latencies kept for percentiles.
+    """
+
+    def __init__(self,
+                 predict_fn: Callable[[List[str]], list],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 10.0,
+                 latency_window: int = 10_000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.latencies = deque(maxlen=latency_window)
+        self.n_batches = 0
+        self.n_texts = 0
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        """Starts the batching worker on the running event loop."""
+
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stops the batching worker."""
+
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, texts: List[str]) -> list:
+        """Queues texts for prediction and returns their results once their batches have been scored."""
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+        results = await asyncio.gather(*futures)
+        self.latencies.append(time.perf_counter() - start)
+        return results
+
+    async def _next_batch(self) -> list:
+        """Waits for the first queued text, then collects more until the batch is full or max_wait_ms passes."""
+
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.predict_fn, texts)
+                if len(results) != len(batch):
+                    raise ValueError(f"predict_fn returned {len(results)} results for {len(batch)} texts.")
+            except Exception as e:
+                logging.error(f"Prediction failed for a batch of {len(texts)} texts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self.n_batches += 1
+            self.n_texts += len(batch)
+
+    def metrics(self) -> dict:
+        """Returns request latency percentiles (milliseconds), the queue depth and batch statistics."""
+
+        latencies = np.asarray(self.latencies) * 1000
+        percentiles = ({f"p{q}": float(np.percentile(latencies, q)) for q in (50, 90, 95, 99)}
+                       if len(latencies) else {})
+        return {
+            'latency_ms': percentiles,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'requests': len(latencies),
+            'batches': self.n_batches,
+            'texts': self.n_texts,
+            'mean_batch_size': self.n_texts / self.n_batches if self.n_batches else 0.0
+        }
+
+
+def pipeline_predict_fn(pipeline: dict) -> Callable[[List[str]], list]:
+    """Returns a function scoring a list of texts with a trained pipeline (see src.inference.load_pipeline)."""
+
+    def predict(texts: List[str]) -> list:
+        predictions = predict_texts(pipeline, pd.Series(texts, dtype=object))
+        probability_columns = [column for column in predictions.columns if column.startswith('proba_')]
+        return [
+            {'prediction': row['prediction'],
+             'probabilities': {column[len('proba_'):]: float(row[column]) for column in probability_columns}}
+            for row in predictions.to_dict(orient='records')
+            ]
+
+    return predict
+
+
+class InferenceServer:
+    """
+    A minimal local HTTP/1.1 server (asyncio, no external dependencies) exposing a MicroBatcher.
+
+    Endpoints:
+    - POST /predict: a JSON body {"texts": [...]} or {"text": "..."}; returns {"predictions": [...]}.
+    - GET /metrics: latency percentiles, queue depth and batch statistics.
+    - GET /health: {"status": "ok"}.
+
+    Parameters:
+    - batcher (MicroBatcher): The batcher used to score texts.
+    - host (str): The interface to bind. Default is localhost only.
+    - port (int): The port to bind (0 picks a free port).
+    - max_body_bytes (int): The largest accepted request body.
+    """
+
+    def __init__(self, batcher: MicroBatcher, host: str = '127.0.0.1', port: int = 8080,
+                 max_body_bytes: int = 10_000_000):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.max_body_bytes = max_body_bytes
+        self._server = None
+
+    async def start(self):
+        """Starts the batcher and begins listening. The bound port is available as self.port."""
+
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"Inference server listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        """Stops listening and stops the batcher."""
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await self._route(reader)
+        except Exception as e:
+            logging.error(f"Request failed: {e}")
+            status, payload = 500, {'error': str(e)}
+
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, reader: asyncio.StreamReader) -> tuple:
+        """Parses a request and returns the (status, payload) of its response."""
+
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            return 400, {'error': 'Malformed request line.'}
+        method, path = request_line[0], request_line[1].split('?')[0]
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, self.batcher.metrics()
+        if path != '/predict':
+            return 404, {'error': f"Unknown path {path}."}
+        if method != 'POST':
+            return 405, {'error': 'Use POST for /predict.'}
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {'error': 'Content-Length must be a non-negative integer.'}
+        if length > self.max_body_bytes:
+            return 413, {'error': 'Request body too large.'}
+        try:
+            request = json.loads(await reader.readexactly(length))
+        except (json.JSONDecodeError, UnicodeDecodeError, asyncio.IncompleteReadError):
+            return 400, {'error': 'Request body must be valid JSON.'}
+
+        texts = None
+        if isinstance(request, dict):
+            texts = request['texts'] if 'texts' in request else [request.get('text')]
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return 400, {'error': 'Provide "text" (a string) or "texts" (a list of strings).'}
+        return 200, {'predictions': await self.batcher.submit(texts)}
+
+
+def serve(
+        pipeline_path: str,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10.0
+        ):
+    """
+    Loads a trained pipeline and serves it over HTTP until interrupted.
+
+    Parameters:
+    - pipeline_path (str): The path of a pipeline saved by src.inference.save_pipeline.
+    - host (str): The interface to bind. Default is localhost only.
+    - port (int): The port to bind.
+    - max_batch_size (int): The maximum number of texts per micro-batch.
+    - max_wait_ms (float): The maximum time to wait for a micro-batch to fill, in milliseconds.
+    """
+
+    batcher = MicroBatcher(
+        pipeline_predict_fn(load_pipeline(pipeline_path)),
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms
+        )
+    try:
+        asyncio.run(InferenceServer(batcher, host=host, port=port).serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Inference server stopped.")
@@ -0,0 +1,172 @@
+import cProfile
+import datetime
+import json
+import logging
+import os
+import platform
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _cpu_seconds() -> float:
+    """Returns the CPU time (user + system) of this process and of its terminated child processes."""
+
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class _PeakRSSMonitor:
+    """
+    Samples the resident set size of this process and its child processes (e.g. joblib workers) in a background
+    thread and keeps the highest value seen. The peak is None if psutil is not installed.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        try:
+            import psutil
+        except ImportError:
+            logging.warning("psutil is not installed: peak RSS is not recorded.")
+            psutil = None
+        self._psutil = psutil
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _rss(self) -> int:
+        process = self._psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except self._psutil.Error:
+                pass
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._rss())
+
+    def start(self):
+        if self._psutil is not None:
+            self.peak = self._rss()
+            self._thread.start()
+
+    def stop(self):
+        if self._psutil is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, self._rss())
+
+
+class RunReport:
+    """
+    Records the cost of each stage of a pipeline run: wall time, CPU time, peak memory and the number of rows
+    going in and out. The report is written as JSON by save.
+
+    If a stage raises, its record is kept with the error, and the report records the failed stage, so a report
+    saved after a failed run shows where it failed.
+
+    Peak RSS covers this process and its child processes, sampled every 50 ms. CPU time includes worker processes
+    only once they have exited (joblib keeps its workers alive between calls, so their CPU time may be missing).
+
+    Parameters:
+    - trace_memory (bool, optional): Also record the peak memory allocated by Python objects in each stage with
+                                     tracemalloc. This slows the run down noticeably. Default is False.
+    - profile_stages (list, optional): The names of the stages to run under cProfile.
+    - profile_dir (str, optional): The directory the profiles are written to, as <stage>.prof (pstats format,
+                                   readable by pstats, snakeviz or flameprof). Required if profile_stages is given.
+    - metadata (dict, optional): Run settings (e.g. command-line options) stored with the report.
+    """
+
+    def __init__(self, trace_memory: bool = False, profile_stages: list = None, profile_dir: str = None,
+                 metadata: dict = None):
+        if profile_stages and not profile_dir:
+            raise ValueError("profile_dir is required to profile stages.")
+        self.trace_memory = trace_memory
+        self.profile_stages = set(profile_stages or [])
+        self.profile_dir = profile_dir
+        self.metadata = metadata or {}
+        self.started = datetime.datetime.now()
+        self.stages = []
+        self.failed_stage = None
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        """
+        Measures the code run inside the context as the stage name. The context yields the stage's record (a dict),
+        in which 'rows_out' (and any other counts) should be set.
+
+        Example:
+            with report.stage('preprocessing', rows_in=len(data)) as record:
+                data = data_preprocessing(data, features_name)
+                record['rows_out'] = len(data)
+        """
+
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        profiler = cProfile.Profile() if name in self.profile_stages else None
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        rss_monitor = _PeakRSSMonitor()
+
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        rss_monitor.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            self.failed_stage = name
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            rss_monitor.stop()
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = _cpu_seconds() - cpu_start
+            record['peak_rss_mb'] = rss_monitor.peak / 2 ** 20 if rss_monitor.peak is not None else None
+            if self.trace_memory:
+                record['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                if started_tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(record['profile'])
+
+            self.stages.append(record)
+            logging.info(f"Stage {name}: {record['wall_seconds']:.2f}s wall, {record['cpu_seconds']:.2f}s CPU, "
+                         f"rows {record['rows_in']} -> {record['rows_out']}")
+
+    def to_dict(self) -> dict:
+        """Returns the report: the run metadata and the records of the stages run so far."""
+
+        return {
+            'started': self.started.isoformat(),
+            'failed_stage': self.failed_stage,
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'settings': self.metadata,
+            'total_wall_seconds': sum(record['wall_seconds'] for record in self.stages),
+            'stages': self.stages
+        }
+
+    def save(self, path: str):
+        """Writes the report to path as JSON (its directory is created if missing)."""
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=4, default=str)
+        logging.info(f"Run report saved to {path}")
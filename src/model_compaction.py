@@ -0,0 +1,122 @@
+import numpy as np
+import logging
+from scipy import sparse
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class CompactForest:
+    """
+    A compact, prediction-only copy of a fitted RandomForestClassifier (or other forest of decision tree
+    classifiers), for storing and loading trained pipelines.
+
+    The nodes of all trees are concatenated into a few flat arrays: child indices and (remapped) feature indices
+    as int32, thresholds as float32, and class probabilities as float32 for leaves only. Thresholds are rounded
+    down to float32, which gives the same splits as scikit-learn (it compares float32 feature values). The arrays
+    are plain numpy arrays, so loading needs no tree reconstruction. A forest saved uncompressed can be
+    memory-mapped by joblib (compressed files, as written by main.py --compact, are read into memory).
+
+    Prediction walks all trees for a batch of documents at once, one tree level per step, on a dense copy of just
+    the feature columns used by the forest. Probabilities match the original forest up to float32 rounding.
+    Missing values (NaN) are not supported.
+
+    Parameters:
+    - forest: A fitted forest with estimators_ (decision tree classifiers) and classes_.
+    - batch_size (int): The number of documents predicted at a time.
+    """
+
+    def __init__(self, forest, batch_size: int = 1_000):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.batch_size = batch_size
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots_ = offsets[:-1].astype(np.int32)
+        left = np.concatenate([tree.children_left for tree in trees])
+        right = np.concatenate([tree.children_right for tree in trees])
+        is_leaf = left == -1
+        node_offsets = np.repeat(offsets[:-1], [tree.node_count for tree in trees])
+        self.children_left_ = np.where(is_leaf, -1, left + node_offsets).astype(np.int32)
+        self.children_right_ = np.where(is_leaf, -1, right + node_offsets).astype(np.int32)
+
+        # Only the features used in splits are kept, renumbered from 0
+        feature = np.concatenate([tree.feature for tree in trees])
+        self.features_used_, remapped = np.unique(feature[~is_leaf], return_inverse=True)
+        self.feature_ = np.full(len(feature), -1, dtype=np.int32)
+        self.feature_[~is_leaf] = remapped
+
+        # Round thresholds down to float32 so that x <= threshold is unchanged for float32 x
+        threshold = np.concatenate([tree.threshold for tree in trees])
+        threshold_32 = threshold.astype(np.float32)
+        rounded_up = threshold_32.astype(np.float64) > threshold
+        threshold_32[rounded_up] = np.nextafter(threshold_32[rounded_up], np.float32(-np.inf))
+        self.threshold_ = threshold_32
+
+        # Leaf class probabilities (each tree's leaf values normalised, as in DecisionTreeClassifier.predict_proba)
+        values = np.concatenate([tree.value[:, 0, :] for tree in trees])[is_leaf]
+        totals = values.sum(axis=1, keepdims=True)
+        self.leaf_proba_ = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0).astype(np.float32)
+        self.leaf_index_ = np.full(len(feature), -1, dtype=np.int32)
+        self.leaf_index_[is_leaf] = np.arange(is_leaf.sum(), dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the forest's arrays."""
+
+        return sum(getattr(self, name).nbytes for name in (
+            'roots_', 'children_left_', 'children_right_', 'feature_', 'features_used_', 'threshold_',
+            'leaf_proba_', 'leaf_index_'))
+
+    def _predict_proba_batch(self, X) -> np.ndarray:
+        # Dense float32 copy of the used columns only
+        columns = X[:, self.features_used_]
+        columns = columns.toarray() if sparse.issparse(columns) else np.asarray(columns)
+        columns = columns.astype(np.float32, copy=False)
+
+        rows = np.arange(len(columns))[:, None]
+        nodes = np.broadcast_to(self.roots_, (len(columns), len(self.roots_))).copy()
+        internal = self.children_left_[nodes] != -1
+        while internal.any():
+            current = nodes[internal]
+            go_left = columns[np.broadcast_to(rows, nodes.shape)[internal], self.feature_[current]] \
+                <= self.threshold_[current]
+            nodes[internal] = np.where(go_left, self.children_left_[current], self.children_right_[current])
+            internal = self.children_left_[nodes] != -1
+        return self.leaf_proba_[self.leaf_index_[nodes]].mean(axis=1)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Returns the mean class probabilities of the trees, with shape (n_documents, n_classes)."""
+
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}.")
+        if sparse.issparse(X):
+            X = X.tocsr()
+        return np.vstack([self._predict_proba_batch(X[start:start + self.batch_size])
+                          for start in range(0, X.shape[0], self.batch_size)]) if X.shape[0] \
+            else np.zeros((0, len(self.classes_)), dtype=np.float32)
+
+    def predict(self, X) -> np.ndarray:
+        """Returns the class with the highest mean probability."""
+
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compact_pipeline(vectorizer, classifier) -> tuple:
+    """
+    Compacts a trained pipeline for storage: drops the vectorizer's stop_words_ (the terms removed by min_df,
+    max_df and max_features, kept by scikit-learn for introspection only) and converts a forest classifier to a
+    CompactForest.
+
+    Returns:
+    - tuple: The compacted (vectorizer, classifier).
+    """
+
+    if hasattr(vectorizer, 'stop_words_'):
+        del vectorizer.stop_words_
+    if hasattr(classifier, 'estimators_') and all(hasattr(e, 'tree_') for e in classifier.estimators_):
+        classifier = CompactForest(classifier)
+        logging.info(f"Forest compacted to {classifier.nbytes / 2 ** 20:.1f} MB "
+                     f"({len(classifier.features_used_)} features used).")
+    return vectorizer, classifier
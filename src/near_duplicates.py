@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+import logging
+import zlib
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Mersenne prime used by the MinHash permutations (keeps a * x + b within 64 bits)
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    """Returns the distinct CRC32 hashes of the word shingles in text."""
+
+    words = text.lower().split()
+    if len(words) <= shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64))
+
+
+def minhash_signatures(
+        texts: pd.Series,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 42
+        ) -> np.ndarray:
+    """
+    Computes MinHash signatures of word shingles for each text.
+
+    Parameters:
+    - texts (pd.Series): A pandas Series containing text values.
+    - num_perm (int): The number of hash permutations (signature length).
+    - shingle_size (int): The number of words per shingle.
+    - seed (int): The seed used to draw the permutations.
+
+    Returns:
+    - np.ndarray: An array of shape (len(texts), num_perm) with one signature per row.
+    """
+
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)[:, None]
+    b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm).astype(np.uint64)[:, None]
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for row, text in enumerate(texts):
+        shingles = _shingle_hashes(text, shingle_size) % _MERSENNE_PRIME
+        signatures[row] = ((a * shingles[None, :] + b) % _MERSENNE_PRIME).min(axis=1)
+    return signatures
+
+
+def lsh_parameters(threshold: float, num_perm: int) -> tuple:
+    """
+    Chooses the number of LSH bands and rows per band (using at most num_perm signature values). The S-curve
+    threshold, (1 / bands) ** (1 / rows), is set as close as possible below the requested similarity threshold,
+    favouring recall; false candidates are removed when pairs are verified.
+
+    Returns:
+    - tuple: (bands, rows)
+    """
+
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1)]
+    s_curve = {br: (1 / br[0]) ** (1 / br[1]) for br in candidates}
+    below = [br for br in candidates if s_curve[br] <= threshold]
+    if not below:
+        return min(candidates, key=lambda br: s_curve[br])
+    return max(below, key=lambda br: s_curve[br])
+
+
+def find_near_duplicates(
+        texts: pd.Series,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 42,
+        batch_size: int = 1_000_000
+        ) -> pd.Series:
+    """
+    Finds clusters of near-duplicate texts using MinHash signatures and locality-sensitive hashing (LSH).
+
+    Texts are only compared when they share an LSH bucket, so the cost grows with the number of rows and
+    buckets rather than the number of row pairs. Each bucket member is compared with the bucket's first member,
+    and pairs whose estimated Jaccard similarity (of word shingles) reaches threshold are linked. Clusters are the
+    connected components of these links.
+
+    Parameters:
+    - texts (pd.Series): A pandas Series containing text values.
+    - threshold (float): The minimum estimated Jaccard similarity for two texts to be near-duplicates.
+    - num_perm (int): The number of MinHash permutations.
+    - shingle_size (int): The number of words per shingle.
+    - seed (int): The seed used to draw the MinHash permutations.
+    - batch_size (int): The number of candidate pairs verified at once (bounds memory use).
+
+    Returns:
+    - pd.Series: The cluster id of each row belonging to a cluster of two or more texts (indexed like texts).
+                 Rows without near-duplicates are omitted.
+
+    Raises:
+    - ValueError: If threshold is not within (0, 1].
+    """
+
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be within (0, 1].")
+
+    n_rows = len(texts)
+    if n_rows < 2:
+        return pd.Series(dtype='int64', name='cluster_id')
+
+    signatures = minhash_signatures(texts, num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+    bands, rows = lsh_parameters(threshold, num_perm)
+
+    # Bucket rows band by band; link each bucket member to the bucket's first member
+    mixer = np.random.RandomState(seed + 1).randint(1, 2**62, size=rows, dtype=np.int64).astype(np.uint64) | 1
+    positions = np.arange(n_rows)
+    left, right = [], []
+    for band in range(bands):
+        band_hash = signatures[:, band * rows:(band + 1) * rows] @ mixer
+        codes, _ = pd.factorize(band_hash)
+        first_in_bucket = np.full(codes.max() + 1, -1)
+        first_in_bucket[codes[::-1]] = positions[::-1]
+        representative = first_in_bucket[codes]
+        linked = representative != positions
+        left.append(representative[linked])
+        right.append(positions[linked])
+
+    left = np.concatenate(left)
+    right = np.concatenate(right)
+
+    # Drop repeated candidate pairs, then verify the estimated similarity in batches
+    pairs = np.unique(np.stack([left, right], axis=1), axis=0) if len(left) else np.empty((0, 2), dtype=int)
+    verified = np.zeros(len(pairs), dtype=bool)
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        similarity = (signatures[batch[:, 0]] == signatures[batch[:, 1]]).mean(axis=1)
+        verified[start:start + batch_size] = similarity >= threshold
+    pairs = pairs[verified]
+
+    # Clusters are the connected components of the verified links
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n_rows, n_rows))
+    _, labels = connected_components(graph, directed=False)
+    cluster_sizes = np.bincount(labels)
+    in_cluster = cluster_sizes[labels] > 1
+
+    clusters = pd.Series(labels[in_cluster], index=texts.index[in_cluster], name='cluster_id')
+    logging.info(f"{clusters.nunique()} near-duplicate clusters covering {len(clusters)} rows were found "
+                 f"({bands} LSH bands of {rows} rows, threshold {threshold}).")
+    return clusters
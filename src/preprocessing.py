@@ -1,18 +1,65 @@
 import pandas as pd
+import numpy as np
 import logging
 import datetime
+import os
 from src.config import load_config
+from src.audit import AuditSink
+from src.near_duplicates import find_near_duplicates
 
 # Config logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Load configuration
-config = load_config()
+
+def save_audit_file(
+        data: pd.DataFrame,
+        path: str,
+        append: bool = False,
+        audit_sink: AuditSink = None
+        ):
+    """
+    Saves records removed during preprocessing to a CSV file for auditing.
+
+    Parameters:
+    - data (pd.DataFrame): The records to save.
+    - path (str): The CSV file path.
+    - append (bool): If True, appends to an existing file (writing the header only if the file is new).
+    - audit_sink (AuditSink, optional): If given, the records are queued to the sink and written in the background
+                                        (in the sink's format). The sink itself appends every write after the first
+                                        to a path, so append is ignored.
+
+    Raises:
+    - FileNotFoundError: If unable to save the records to the specified path. With audit_sink, the error of an
+                         earlier background write is raised as it occurred instead.
+    """
+
+    if audit_sink is not None:
+        audit_sink.write(data, path)
+        return
+
+    try:
+        if append and os.path.exists(path):
+            data.to_csv(path, index=False, mode='a', header=False)
+        else:
+            data.to_csv(path, index=False)
+    except Exception as e:
+        logging.error(f"Failed to save audit records to {path}. Error: {str(e)}")
+        raise FileNotFoundError("Could not save duplicates to file. Check the directory exists and is writable.")
+
+
+def outlier_bounds(
+        mean_length: float,
+        std_dev_length: float
+        ) -> tuple:
+    """Returns the (lower, upper) feature length bounds, three standard deviations either side of the mean."""
+
+    return mean_length - 3 * std_dev_length, mean_length + 3 * std_dev_length
 
 
 def delete_outliers(
         data: pd.DataFrame,
-        features_name: 'str'
+        features_name: 'str',
+        audit_sink: AuditSink = None
         ) -> pd.DataFrame:
     """
     Remove outlying data-points based on the number of characters in the features string. Rows where
@@ -21,23 +68,25 @@ def delete_outliers(
     Parameters:
     - data (pd.DataFrame): A pandas DataFrame with strings as values.
     - features_name (str): The name of the column to check for outliers.
+    - audit_sink (AuditSink, optional): If given, the outliers are written through the sink in the background.
 
     Returns:
     - data (pd.DataFrame): A pandas DataFrame with outliers removed.
     """
 
-    # Calculate upper/lower bounds
-    mean_length = data[features_name].str.len().mean()
-    std_dev_length = data[features_name].str.len().std()
-    lower_bound = mean_length - 3 * std_dev_length
-    upper_bound = mean_length + 3 * std_dev_length
+    config = load_config()
+
+    # Calculate upper/lower bounds (string lengths are computed once)
+    lengths = data[features_name].str.len()
+    lower_bound, upper_bound = outlier_bounds(lengths.mean(), lengths.std())
+    within_bounds = lengths.between(lower_bound, upper_bound).to_numpy()
 
     # Filter the data
-    data_f = data[data[features_name].str.len().between(lower_bound, upper_bound)]
+    data_f = data[within_bounds]
     
     # Store the outliers
-    outliers = data[~data[features_name].str.len().between(lower_bound, upper_bound)]
-    outliers.to_csv(f"{config.outliers}/{datetime.date.today()}_outliers.csv", index=False)
+    outliers = data[~within_bounds]
+    save_audit_file(outliers, f"{config.outliers}/{datetime.date.today()}_outliers.csv", audit_sink=audit_sink)
 
     logging.info(f"{len(outliers)} rows were removed due to length exceeding 3 standard deviations.")
 
@@ -48,17 +97,28 @@ def data_preprocessing(
         data: pd.DataFrame,
         features_name: str,
         save_duplicates: bool = True,
-        remove_outliers: bool = True
+        remove_outliers: bool = True,
+        near_duplicate_threshold: float = None,
+        audit_sink: AuditSink = None
         ) -> pd.DataFrame:
     """
     Performs basic filtering steps on the feature column including removing NaNs, handling duplicate
     rows, and potential outliers.
 
+    Exact duplicates are found with a single hashing pass over the features column. Optionally, near-duplicates
+    (e.g. reports re-entered with small edits) are found with MinHash/LSH, and only the first row of each 
+    near-duplicate cluster is kept.
+
     Parameters:
     - data (pd.DataFrame): A pandas DataFrame with a nominated target and features column.
     - features_name (str): The name of the features variable (must be a column in 'data').
     - save_duplicates (bool): A boolean determining if duplicate records are kept for auditing.
     - remove_outliers (bool): A boolean that determines the treatment of outliers (default (True) is to remove).
+    - near_duplicate_threshold (float, optional): If set, rows whose estimated Jaccard similarity (of word 
+                                                  shingles) reaches this threshold are treated as near-duplicates.
+                                                  Default (None) removes exact duplicates only.
+    - audit_sink (AuditSink, optional): If given, the audit records are written through the sink on a background
+                                        thread. Default writes them synchronously as CSV.
 
     Returns:
     - data (pd.DataFrame): A filtered pandas DataFrame.
@@ -66,7 +126,7 @@ def data_preprocessing(
     Raises:
     - TypeError: If data is not of type pd.DataFrame, features_name is not of type str, and save_duplicates and 
                  remove_outliers are not of type bool.
-    - ValueError: If DataFrame is empty after removing NaNs.
+    - ValueError: If DataFrame is empty after removing NaNs, or near_duplicate_threshold is not within (0, 1].
     - FileNotFoundError: If unable to save duplicates to specified directory.
     """
 
@@ -77,6 +137,10 @@ def data_preprocessing(
         raise TypeError("features_name must be a string.")
     if not isinstance(save_duplicates, bool) or not isinstance(remove_outliers, bool):
         raise TypeError("save_duplicates and remove_outliers must be boolean values.")
+    if near_duplicate_threshold is not None and not 0 < near_duplicate_threshold <= 1:
+        raise ValueError("near_duplicate_threshold must be within (0, 1].")
+
+    config = load_config()
     
     # Remove NaNs from features column
     data = data.dropna(subset=[features_name])
@@ -87,7 +151,11 @@ def data_preprocessing(
         raise ValueError(error_message)
 
     # Check for duplicate values in the features column -- first instances are kept.
-    data_dupes_index = data.duplicated(subset=features_name, keep='first')
+    # Each value is hashed once; codes are numbered in order of first appearance, so a row is the first
+    # instance of its value when its code exceeds every earlier code.
+    codes, _ = pd.factorize(data[features_name])
+    previous_max = np.maximum.accumulate(np.concatenate(([-1], codes[:-1])))
+    data_dupes_index = codes <= previous_max
     
     # Gather info on the duplicates removed.
     data_dupes_sum = data_dupes_index.sum()
@@ -98,16 +166,33 @@ def data_preprocessing(
 
     # If True, store the duplicate values (along with first occurence) for auditing.
     if save_duplicates:
-        data_dupes_index_with_first = data.duplicated(subset=features_name, keep=False)
+        data_dupes_index_with_first = np.bincount(codes)[codes] > 1
         duplicates = data[data_dupes_index_with_first]
-        try:
-            duplicates.to_csv(f"{config.duplicate_data}/{datetime.date.today()}_duplicates.csv", index=False)
-        except Exception as e:
-            logging.error(f"Failed to save duplicates. Error: {str(e)}")
-            raise FileNotFoundError("Could not save duplicates to file. Check the directory exists and is writable.")
+        save_audit_file(duplicates, f"{config.duplicate_data}/{datetime.date.today()}_duplicates.csv",
+                        audit_sink=audit_sink)
+
+    # Check for near-duplicates and keep the first row of each cluster.
+    if near_duplicate_threshold is not None:
+        # Clusters are indexed by row position in data_f
+        clusters = find_near_duplicates(
+            data_f[features_name].reset_index(drop=True),
+            threshold=near_duplicate_threshold
+            )
+        near_dupes_index = np.zeros(len(data_f), dtype=bool)
+        near_dupes_index[clusters.index[clusters.duplicated(keep='first')]] = True
+        logging.info(f'{near_dupes_index.sum()} near-duplicate records have been removed.')
+
+        if save_duplicates:
+            near_duplicates = data_f.iloc[clusters.index].assign(cluster_id=clusters.to_numpy())
+            save_audit_file(
+                near_duplicates.sort_values('cluster_id', kind='stable'),
+                f"{config.duplicate_data}/{datetime.date.today()}_near_duplicates.csv",
+                audit_sink=audit_sink
+                )
+        data_f = data_f[~near_dupes_index]
     
     # Check for potential outliers and remove.
     if remove_outliers:
-        data_f = delete_outliers(data_f,features_name)
+        data_f = delete_outliers(data_f,features_name, audit_sink=audit_sink)
 
     return data_f
\ No newline at end of file
@@ -1,41 +1,98 @@
 import pandas as pd
 import logging
 import glob
+from typing import Dict, Iterator, List, Union
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def load_data(directory_path: str) -> pd.DataFrame:
+
+def _read_csv(file_path: str, directory_path: str, **read_kwargs):
+    """Reads a single CSV file (or a chunk iterator over it), logging empty or unparsable files."""
+
+    try:
+        return pd.read_csv(file_path, **read_kwargs)
+    except pd.errors.EmptyDataError:
+        logging.error(f"File {file_path} found at {directory_path} is empty")
+        raise
+    except pd.errors.ParserError:
+        logging.error(f"Parser error for file {file_path} at {directory_path}")
+        raise
+
+
+def _iter_chunks(files: List[str], directory_path: str, **read_kwargs) -> Iterator[pd.DataFrame]:
+    """Yields chunks from each file in turn, re-indexing them so index values are unique across files."""
+
+    offset = 0
+    for file_path in files:
+        for chunk in _read_csv(file_path, directory_path, **read_kwargs):
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+        logging.info(f"Data successfully streamed from {file_path}")
+
+
+def load_data(
+        directory_path: str,
+        all_files: bool = False,
+        columns: List[str] = None,
+        engine: str = None,
+        dtype: Union[str, Dict] = None,
+        chunksize: int = None
+        ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Loads data from a CSV file into a Pandas DataFrame.
 
     Parameters:
     - directory_path (str): The path to the directory containing CSV files to be loaded.
+    - all_files (bool, optional): If True, reads every CSV file in the directory (in name order) and concatenates
+                                  them. Default is False, which reads only the first file.
+    - columns (List[str], optional): The columns to load (e.g. the features and target columns). Default loads
+                                     all columns.
+    - engine (str, optional): The pandas CSV parser ('c', 'python' or 'pyarrow'). Default is pandas' default.
+    - dtype (str or dict, optional): Explicit column dtypes passed to the parser.
+    - chunksize (int, optional): If set, returns an iterator of DataFrames with at most chunksize rows, so that
+                                 data larger than memory can be processed chunk by chunk. Not supported by the
+                                 pyarrow engine.
 
     Returns:
-    - pd.DataFrame: The DataFrame containing the data from the CSV file.
+    - pd.DataFrame: The DataFrame containing the data from the CSV file(s), or an iterator of DataFrames if
+                    chunksize is set. Index values are unique across files.
 
     Raises:
     - FileNotFoundError: If no file exists.
+    - ValueError: If chunksize is used with the pyarrow engine.
     - pd.errors.EmptyDataError: If the file is empty.
     - pd.errors.ParserError: If there is an issue with the file.
     """
 
-    files = glob.glob(f"{directory_path}/*.csv")
-
-    if files:
-        try:
-            first_csv = files[0]
-            data = pd.read_csv(first_csv)
-            logging.info(f"Data successfully loaded from {first_csv}")
-            return data
-        except pd.errors.EmptyDataError:
-            logging.error(f"File {first_csv} found at {directory_path} is empty")
-            raise
-        except pd.errors.ParserError:
-            logging.error(f"Parser error for file {first_csv} at {directory_path}")
-            raise
-    else:
+    files = sorted(glob.glob(f"{directory_path}/*.csv"))
+
+    if not files:
         file_not_found_error_msg = (f"File not found at: {directory_path}")
         logging.error(file_not_found_error_msg)
         raise FileNotFoundError(file_not_found_error_msg)
 
+    if chunksize is not None and engine == 'pyarrow':
+        error_message = "The pyarrow engine does not support chunksize. Use the 'c' engine for chunked reads."
+        logging.error(error_message)
+        raise ValueError(error_message)
+
+    if not all_files:
+        files = files[:1]
+
+    read_kwargs = {'usecols': columns, 'dtype': dtype}
+    if engine is not None:
+        read_kwargs['engine'] = engine
+
+    # Stream chunks lazily across all files
+    if chunksize is not None:
+        return _iter_chunks(files, directory_path, chunksize=chunksize, **read_kwargs)
+
+    frames = []
+    for file_path in files:
+        frames.append(_read_csv(file_path, directory_path, **read_kwargs))
+        logging.info(f"Data successfully loaded from {file_path}")
+
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,288 @@
+import pandas as pd
+import numpy as np
+import logging
+import os
+import time
+import joblib
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils.validation import check_is_fitted
+from sklearn.exceptions import NotFittedError
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _pair_similarity(queries, query_rows: np.ndarray, vectors, vector_rows: np.ndarray,
+                     batch_size: int = 20_000) -> np.ndarray:
+    """
+    Returns the dot product of each (query row, vector row) pair of L2-normalised rows, i.e. their cosine. Pairs are
+    compared batch_size at a time, as each batch copies its query and vector rows.
+    """
+
+    similarity = np.empty(len(query_rows), dtype=np.float64)
+    for start in range(0, len(query_rows), batch_size):
+        q = query_rows[start:start + batch_size]
+        v = vector_rows[start:start + batch_size]
+        if sparse.issparse(vectors):
+            similarity[start:start + batch_size] = np.asarray(queries[q].multiply(vectors[v]).sum(axis=1)).ravel()
+        else:
+            similarity[start:start + batch_size] = np.einsum('ij,ij->i', queries[q], vectors[v])
+    return similarity
+
+
+def _top_k(query_rows: np.ndarray, vector_rows: np.ndarray, similarity: np.ndarray, k: int) -> tuple:
+    """Keeps the k most similar pairs of each query, sorted by query and then by decreasing similarity."""
+
+    order = np.lexsort((-similarity, query_rows))
+    query_rows, vector_rows, similarity = query_rows[order], vector_rows[order], similarity[order]
+    rank = np.arange(len(query_rows)) - np.searchsorted(query_rows, query_rows, side='left')
+    keep = rank < k
+    return query_rows[keep], vector_rows[keep], similarity[keep], rank[keep]
+
+
+class SimilarCaseIndex:
+    """
+    A nearest-neighbour index of cleaned report narratives (the output of text_cleaning), searched by cosine
+    similarity of their TF-IDF vectors or embeddings.
+
+    Approximate search uses random-projection LSH: each of n_tables tables hashes a vector to the signs of its
+    projections on n_bits random hyperplanes, so similar reports tend to share a bucket. Each table is stored as a
+    sorted array of bucket codes, so the buckets of a batch of queries are found with np.searchsorted. The
+    candidates from all tables are then ranked by their exact cosine similarity. More tables raise recall, and more
+    bits make buckets smaller (faster, lower recall).
+
+    New reports are added with add: they are vectorized with the already fitted vectorizer and their codes are
+    merged into the sorted tables, without re-hashing or re-vectorizing the indexed reports. The vectorizer is not
+    refitted, so words first seen in new reports are ignored by TF-IDF.
+
+    Parameters:
+    - vectorizer (optional): A vectorizer (e.g. TfidfVectorizer or EmbeddingFeatureExtractor). If not fitted, it is
+                             fitted on the reports passed to build. Default is a new TfidfVectorizer.
+    - n_tables (int): The number of LSH tables.
+    - n_bits (int): The number of hyperplanes (bits of the bucket code) per table, at most 62.
+    - seed (int): The seed used to draw the hyperplanes.
+    """
+
+    def __init__(self, vectorizer=None, n_tables: int = 8, n_bits: int = 12, seed: int = 42):
+        if not 1 <= n_bits <= 62:
+            raise ValueError("n_bits must be within [1, 62].")
+        self.vectorizer = vectorizer if vectorizer is not None else TfidfVectorizer()
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+
+    def __len__(self):
+        return len(self.ids_) if hasattr(self, 'ids_') else 0
+
+    def _vectorize(self, texts: pd.Series):
+        vectors = self.vectorizer.transform(texts.to_numpy(dtype=object))
+        if sparse.issparse(vectors):
+            vectors = vectors.tocsr().astype(np.float32)
+        else:
+            vectors = np.asarray(vectors, dtype=np.float32)
+        return normalize(vectors, norm='l2', copy=False)
+
+    def _codes(self, vectors) -> np.ndarray:
+        """Returns the bucket code of each vector in each table, with shape (n_vectors, n_tables)."""
+
+        bits = np.asarray(vectors @ self.planes_) > 0
+        bits = bits.reshape(-1, self.n_tables, self.n_bits).astype(np.int64)
+        return bits @ (np.int64(1) << np.arange(self.n_bits, dtype=np.int64))
+
+    def build(self, texts: pd.Series) -> 'SimilarCaseIndex':
+        """
+        Indexes cleaned texts (replacing any indexed reports). The index values of texts identify the reports
+        in search results.
+        """
+
+        try:
+            check_is_fitted(self.vectorizer)
+        except NotFittedError:
+            self.vectorizer.fit(texts.to_numpy(dtype=object))
+
+        self.vectors_ = self._vectorize(texts)
+        rng = np.random.default_rng(self.seed)
+        self.planes_ = rng.standard_normal((self.vectors_.shape[1], self.n_tables * self.n_bits)).astype(np.float32)
+        self.ids_ = texts.index.to_numpy()
+
+        codes = self._codes(self.vectors_)
+        self.order_ = np.argsort(codes, axis=0, kind='stable')
+        self.sorted_codes_ = np.take_along_axis(codes, self.order_, axis=0)
+        logging.info(f"Indexed {len(self)} reports in {self.n_tables} LSH tables of {self.n_bits} bits.")
+        return self
+
+    def add(self, texts: pd.Series) -> 'SimilarCaseIndex':
+        """
+        Adds cleaned texts to the index without rebuilding it.
+
+        Raises:
+        - ValueError: If the index has not been built.
+        """
+
+        if not hasattr(self, 'ids_'):
+            raise ValueError("The index has not been built. Call build first.")
+        if len(texts) == 0:
+            return self
+
+        vectors = self._vectorize(texts)
+        codes = self._codes(vectors)
+        positions = np.arange(len(self), len(self) + len(texts))
+
+        # Merge the new codes (sorted) into each table
+        new_order = np.argsort(codes, axis=0, kind='stable')
+        new_codes = np.take_along_axis(codes, new_order, axis=0)
+        sorted_codes, order = [], []
+        for table in range(self.n_tables):
+            insert_at = np.searchsorted(self.sorted_codes_[:, table], new_codes[:, table], side='right')
+            sorted_codes.append(np.insert(self.sorted_codes_[:, table], insert_at, new_codes[:, table]))
+            order.append(np.insert(self.order_[:, table], insert_at, positions[new_order[:, table]]))
+        self.sorted_codes_ = np.column_stack(sorted_codes)
+        self.order_ = np.column_stack(order)
+
+        self.vectors_ = sparse.vstack([self.vectors_, vectors], format='csr') if sparse.issparse(vectors) \
+            else np.vstack([self.vectors_, vectors])
+        self.ids_ = np.concatenate([self.ids_, texts.index.to_numpy()])
+        logging.info(f"Added {len(texts)} reports to the index ({len(self)} reports).")
+        return self
+
+    def _candidates(self, codes: np.ndarray) -> tuple:
+        """Returns the distinct (query row, indexed row) pairs that share a bucket in at least one table."""
+
+        query_rows, vector_rows = [], []
+        for table in range(self.n_tables):
+            table_codes = self.sorted_codes_[:, table]
+            low = np.searchsorted(table_codes, codes[:, table], side='left')
+            counts = np.searchsorted(table_codes, codes[:, table], side='right') - low
+            # Expand each query's bucket [low, low + count) into positions in the sorted table
+            starts = np.repeat(low - np.cumsum(counts) + counts, counts)
+            positions = starts + np.arange(counts.sum())
+            query_rows.append(np.repeat(np.arange(len(codes)), counts))
+            vector_rows.append(self.order_[positions, table])
+
+        pairs = np.unique(np.concatenate(query_rows).astype(np.int64) * len(self) + np.concatenate(vector_rows))
+        return pairs // len(self), pairs % len(self)
+
+    def _search_batch(self, queries, k: int, exact: bool) -> tuple:
+        if exact:
+            similarity = queries @ self.vectors_.T
+            similarity = similarity.toarray() if sparse.issparse(similarity) else np.asarray(similarity)
+            n_top = min(k, similarity.shape[1])
+            top = np.argpartition(-similarity, n_top - 1, axis=1)[:, :n_top]
+            query_rows = np.repeat(np.arange(len(top)), n_top)
+            vector_rows = top.ravel()
+            pair_similarity = similarity[query_rows, vector_rows]
+        else:
+            query_rows, vector_rows = self._candidates(self._codes(queries))
+            pair_similarity = _pair_similarity(queries, query_rows, self.vectors_, vector_rows)
+        n_candidates = len(vector_rows)
+        return _top_k(query_rows, vector_rows, pair_similarity, k) + (n_candidates,)
+
+    def search(self, texts: pd.Series, k: int = 10, exact: bool = False, batch_size: int = 1_000) -> pd.DataFrame:
+        """
+        Finds the indexed reports most similar to each of the cleaned texts, in batches of queries.
+
+        Parameters:
+        - texts (pd.Series): The cleaned query texts.
+        - k (int): The number of similar reports returned per query.
+        - exact (bool): If True, every indexed report is compared with each query (brute force). Default uses the
+                        LSH tables, so fewer than k reports may be returned for a query.
+        - batch_size (int): The number of queries searched at a time.
+
+        Returns:
+        - pd.DataFrame: One row per result with the query's index value ('query'), the rank (0 is the most
+                        similar), the id of the indexed report and the cosine similarity.
+
+        Raises:
+        - ValueError: If the index has not been built.
+        """
+
+        return self._search(texts, k=k, exact=exact, batch_size=batch_size)[0]
+
+    def _search(self, texts: pd.Series, k: int, exact: bool, batch_size: int) -> tuple:
+        """Searches in batches and returns the results, the seconds per query of each batch and the candidates."""
+
+        if not hasattr(self, 'ids_'):
+            raise ValueError("The index has not been built. Call build first.")
+
+        results, latencies = [], []
+        n_candidates = 0
+        for start in range(0, len(texts), batch_size):
+            batch = texts.iloc[start:start + batch_size]
+            batch_start = time.perf_counter()
+            query_rows, vector_rows, similarity, rank, batch_candidates = self._search_batch(
+                self._vectorize(batch), k, exact
+                )
+            latencies.append((time.perf_counter() - batch_start) / len(batch))
+            n_candidates += batch_candidates
+            results.append(pd.DataFrame({'query': batch.index.to_numpy()[query_rows],
+                                         'rank': rank,
+                                         'id': self.ids_[vector_rows],
+                                         'similarity': similarity}))
+
+        results = pd.concat(results, ignore_index=True) if results else \
+            pd.DataFrame(columns=['query', 'rank', 'id', 'similarity'])
+        return results, np.asarray(latencies), n_candidates
+
+    def evaluate(self, texts: pd.Series, k: int = 10, batch_size: int = 100) -> dict:
+        """
+        Measures the query latency of approximate and brute-force search and the recall of approximate search.
+
+        Parameters:
+        - texts (pd.Series): The cleaned query texts (with a unique index).
+        - k (int): The number of similar reports retrieved per query.
+        - batch_size (int): The number of queries searched at a time.
+
+        Returns:
+        - dict: The number of queries, k, the recall@k of approximate search (the proportion of the brute-force top
+                k it retrieves), the mean and 95th percentile milliseconds per query of both searches, the speed-up
+                and the mean number of candidates compared per query (NaN without queries).
+        """
+
+        approximate, approximate_latency, n_candidates = self._search(texts, k, exact=False, batch_size=batch_size)
+        exact, exact_latency, _ = self._search(texts, k, exact=True, batch_size=batch_size)
+
+        found = exact.merge(approximate[['query', 'id']], on=['query', 'id'], how='inner')
+        recall = len(found) / len(exact) if len(exact) else np.nan
+        has_queries = len(texts) > 0
+        report = {
+            'queries': len(texts),
+            'k': k,
+            'recall_at_k': recall,
+            'approximate_ms_per_query': 1000 * approximate_latency.mean() if has_queries else np.nan,
+            'approximate_p95_ms_per_query': 1000 * np.percentile(approximate_latency, 95) if has_queries else np.nan,
+            'exact_ms_per_query': 1000 * exact_latency.mean() if has_queries else np.nan,
+            'exact_p95_ms_per_query': 1000 * np.percentile(exact_latency, 95) if has_queries else np.nan,
+            'speedup': exact_latency.mean() / approximate_latency.mean() if has_queries else np.nan,
+            'candidates_per_query': n_candidates / len(texts) if has_queries else np.nan
+        }
+        logging.info(f"Similar-case search: recall@{k} {recall:.3f}, "
+                     f"{report['approximate_ms_per_query']:.2f} ms/query approximate vs "
+                     f"{report['exact_ms_per_query']:.2f} ms/query brute force.")
+        return report
+
+    def save(self, path: str):
+        """Saves the index (its directory is created if missing)."""
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self, path)
+        logging.info(f"Similar-case index saved to {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'SimilarCaseIndex':
+        """
+        Loads an index saved by save. With mmap (default), its arrays are memory-mapped read-only instead of read
+        into memory (reports added later are held in memory).
+
+        Raises:
+        - FileNotFoundError: If no index exists at path.
+        """
+
+        if not os.path.exists(path):
+            error_message = f"Similar-case index not found at: {path}"
+            logging.error(error_message)
+            raise FileNotFoundError(error_message)
+        return joblib.load(path, mmap_mode='r' if mmap else None)
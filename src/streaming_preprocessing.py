@@ -0,0 +1,208 @@
+import pandas as pd
+import numpy as np
+import logging
+import datetime
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator
+from src.config import load_config
+from src.audit import AuditSink
+from src.preprocessing import outlier_bounds, save_audit_file
+
+# Config logging
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class RunningStats:
+    """
+    Online mean and variance accumulator (Welford's algorithm, with Chan et al.'s update for batches).
+    Accumulators built on different chunks can be merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        """Adds a batch of values to the accumulator."""
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        batch = RunningStats()
+        batch.count = values.size
+        batch.mean = values.mean()
+        batch.m2 = ((values - batch.mean) ** 2).sum()
+        self.merge(batch)
+
+    def merge(self, other: 'RunningStats'):
+        """Combines the statistics of another accumulator into this one."""
+
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+
+    def variance(self, ddof: int = 1) -> float:
+        """Returns the variance (sample variance by default, matching pandas)."""
+
+        if self.count - ddof <= 0:
+            return np.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        """Returns the standard deviation (sample standard deviation by default, matching pandas)."""
+
+        return np.sqrt(self.variance(ddof))
+
+
+class SeenHashes:
+    """
+    The 64-bit row hashes seen so far, used to detect duplicates across chunks (8 bytes per unique row).
+
+    Hashes are kept in a few sorted runs, as in a log-structured merge tree. Each chunk's hashes are sorted into a
+    new run, and runs are merged while the newest is at least as large as the one before it. So the whole set is
+    never re-sorted, each hash is merged about log2(n_chunks) times, and lookups search at most that many runs.
+    """
+
+    def __init__(self):
+        self._runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Returns a boolean array flagging the hashes that have been seen before."""
+
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            seen |= run[positions] == hashes
+        return seen
+
+    def add(self, hashes: np.ndarray):
+        """Adds new hashes (unique, and not seen before)."""
+
+        if not len(hashes):
+            return
+        self._runs.append(np.sort(np.asarray(hashes, dtype=np.uint64)))
+        while len(self._runs) > 1 and len(self._runs[-1]) >= len(self._runs[-2]):
+            # Merge two sorted runs with one linear insert rather than a sort
+            newest = self._runs.pop()
+            self._runs[-1] = np.insert(self._runs[-1], np.searchsorted(self._runs[-1], newest), newest)
+
+
+def streaming_data_preprocessing(
+        chunks: Iterable[pd.DataFrame],
+        features_name: str,
+        save_duplicates: bool = True,
+        remove_outliers: bool = True,
+        spool_dir: str = None,
+        audit_sink: AuditSink = None
+        ) -> Iterator[pd.DataFrame]:
+    """
+    Applies the filtering steps of data_preprocessing to chunked input (e.g. load_data(..., chunksize=n)), so
+    that peak memory is bounded by the chunk size rather than the dataset size.
+
+    The first pass removes NaNs, drops rows whose feature value has been seen before (by 64-bit hash) and
+    accumulates feature length statistics with mergeable online accumulators. When outliers are removed, the
+    de-duplicated chunks are spooled to disk and a second pass applies the 3-sigma length filter.
+
+    Unlike data_preprocessing, the duplicates audit file holds the removed repeats only (not the first
+    occurrences, which may be in an earlier chunk). Audit files are appended to chunk by chunk.
+
+    Parameters:
+    - chunks (Iterable[pd.DataFrame]): DataFrames with a nominated target and features column.
+    - features_name (str): The name of the features variable (must be a column in each chunk).
+    - save_duplicates (bool): A boolean determining if duplicate records are kept for auditing.
+    - remove_outliers (bool): A boolean that determines the treatment of outliers (default (True) is to remove).
+    - spool_dir (str, optional): The directory used to spool chunks between passes. Defaults to a temporary
+                                 directory, which is removed afterwards.
+    - audit_sink (AuditSink, optional): If given, the audit records of each chunk are written through the sink on
+                                        a background thread. Default writes them synchronously as CSV.
+
+    Yields:
+    - pd.DataFrame: Filtered chunks.
+
+    Raises:
+    - TypeError: If features_name is not of type str, and save_duplicates and remove_outliers are not of type bool.
+    - ValueError: If the data is empty after removing NaNs.
+    - FileNotFoundError: If unable to save duplicates to specified directory.
+    """
+
+    # Type checks
+    if not isinstance(features_name, str):
+        raise TypeError("features_name must be a string.")
+    if not isinstance(save_duplicates, bool) or not isinstance(remove_outliers, bool):
+        raise TypeError("save_duplicates and remove_outliers must be boolean values.")
+
+    config = load_config()
+    duplicates_path = f"{config.duplicate_data}/{datetime.date.today()}_duplicates.csv"
+    outliers_path = f"{config.outliers}/{datetime.date.today()}_outliers.csv"
+    seen = SeenHashes()
+    length_stats = RunningStats()
+    n_rows = n_duplicates = 0
+
+    spool_path = tempfile.mkdtemp(dir=spool_dir) if remove_outliers else None
+    try:
+        # First pass: NaN removal, hash-based de-duplication and length statistics
+        spooled = []
+        for chunk in chunks:
+            chunk = chunk.dropna(subset=[features_name])
+            if chunk.empty:
+                continue
+
+            hashes = pd.util.hash_pandas_object(chunk[features_name], index=False).to_numpy()
+            is_duplicate = pd.Series(hashes).duplicated().to_numpy() | seen.contains(hashes)
+            seen.add(hashes[~is_duplicate])
+
+            if save_duplicates and is_duplicate.any():
+                save_audit_file(chunk[is_duplicate], duplicates_path, append=n_duplicates > 0,
+                                audit_sink=audit_sink)
+            n_duplicates += is_duplicate.sum()
+
+            chunk = chunk[~is_duplicate]
+            n_rows += len(chunk)
+            chunk_stats = RunningStats()
+            chunk_stats.update(chunk[features_name].str.len().to_numpy())
+            length_stats.merge(chunk_stats)
+
+            if remove_outliers:
+                chunk_file = os.path.join(spool_path, f"chunk_{len(spooled)}.pkl")
+                chunk.to_pickle(chunk_file)
+                spooled.append(chunk_file)
+            else:
+                yield chunk
+
+        if n_rows == 0:
+            error_message = "DataFrame is empty after removing NaNs. Check your data or processing steps."
+            logging.error(error_message)
+            raise ValueError(error_message)
+        logging.info(f'{n_duplicates} duplicate records have been removed.')
+
+        if not remove_outliers:
+            return
+
+        # Second pass: 3-sigma length filter over the spooled chunks
+        lower_bound, upper_bound = outlier_bounds(length_stats.mean, length_stats.std())
+        n_outliers = 0
+        for chunk_file in spooled:
+            chunk = pd.read_pickle(chunk_file)
+            os.remove(chunk_file)
+            within_bounds = chunk[features_name].str.len().between(lower_bound, upper_bound).to_numpy()
+            if not within_bounds.all():
+                save_audit_file(chunk[~within_bounds], outliers_path, append=n_outliers > 0,
+                                audit_sink=audit_sink)
+            n_outliers += (~within_bounds).sum()
+            yield chunk[within_bounds]
+
+        logging.info(f"{n_outliers} rows were removed due to length exceeding 3 standard deviations.")
+    finally:
+        if spool_path is not None:
+            shutil.rmtree(spool_path, ignore_errors=True)
@@ -0,0 +1,153 @@
+import pandas as pd
+import logging
+import os
+import time
+from joblib import Parallel, delayed
+from src.feature_store import FeatureMatrixStore
+from src.inference import save_pipeline
+from src.target_formatting import target_mapping
+from src.train_evaluate import training_and_eval_setup, train_and_evaluate, fit_final_model
+
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _train_target(
+        target_name: str,
+        options: dict,
+        work_dir: str,
+        store_root: str,
+        version: str,
+        setup: dict,
+        results_dir: str,
+        n_jobs: int,
+        search: str,
+        resource: str,
+        cache_dir: str
+        ) -> dict:
+    """
+    Maps one target and trains and evaluates its classifier in a worker process. Only the target's column is read
+    from the shared targets file, and the shared feature matrix is memory-mapped rather than copied.
+    """
+
+    start = time.perf_counter()
+    targets = pd.read_parquet(os.path.join(work_dir, 'targets.parquet'), columns=[target_name])
+    target = target_mapping(dataframe=targets, target_name=target_name, encode=True, **options)
+    texts = pd.read_parquet(os.path.join(work_dir, 'text.parquet'))['text']
+    text = texts.loc[target.index]
+    del texts
+
+    results = train_and_evaluate(X=text, y=target, setup=setup, n_jobs=n_jobs, search=search, resource=resource,
+                                 cache_dir=cache_dir)
+    target_dir = os.path.join(results_dir, target_name)
+    os.makedirs(target_dir, exist_ok=True)
+    results_path = os.path.join(target_dir, 'nested_cv_results.csv')
+    results.to_csv(results_path, index=False)
+
+    # The final model is fitted on the target's rows of the shared matrix
+    stored = FeatureMatrixStore(store_root).load(version)
+    matrix = stored['matrix'][stored['index'].get_indexer(target.index)]
+    vectorizer, classifier, labels = fit_final_model(X=text, y=target, setup=setup, results=results,
+                                                     features=(stored['vectorizer'], matrix))
+    pipeline_path = os.path.join(target_dir, 'pipeline.joblib')
+    save_pipeline(pipeline_path, vectorizer, classifier, labels=labels)
+
+    return {'target': target_name,
+            'documents': len(target),
+            'classes': len(target.cat.categories),
+            'accuracy': results['accuracy'].mean(),
+            'accuracy_std': results['accuracy'].std(),
+            'f1': results['f1'].mean(),
+            'seconds': time.perf_counter() - start,
+            'results': results_path,
+            'pipeline': pipeline_path}
+
+
+def sweep_targets(
+        data: pd.DataFrame,
+        text: pd.Series,
+        targets: dict,
+        results_dir: str,
+        n_jobs: int = -1,
+        search: str = 'grid',
+        resource: str = 'n_samples',
+        feature_store: str = None,
+        cache_dir: str = None
+        ) -> pd.DataFrame:
+    """
+    Trains and evaluates a classifier for each of several targets on a corpus that is preprocessed, cleaned and
+    vectorized once.
+
+    The cleaned texts and the target columns are written once to Parquet files under <results_dir>/work, and the
+    TF-IDF matrix of all texts is stored in a FeatureMatrixStore (or reused from it, if a previous run stored the
+    matrix of the same texts and vectorizer). The per-target jobs (target_mapping, nested CV
+    and the final model) then run concurrently in worker processes. Each job reads only its target column and
+    memory-maps the stored matrix read-only, so the matrix is shared through the page cache instead of being
+    copied to every worker. The nested CV still fits its vectorizer inside each fold.
+
+    Parameters:
+    - data (pd.DataFrame): The preprocessed data, containing a column for each target.
+    - text (pd.Series): The cleaned texts of data (with the same index).
+    - targets (dict): The target names, each mapped to the keyword arguments of its target_mapping call
+                      (e.g. {'offence': {'remap_target': True, 'ignored_values': ['Other']}}).
+    - results_dir (str): The directory the results are written to. Each target's nested CV results and pipeline
+                         are saved under <results_dir>/<target>.
+    - n_jobs (int, optional): The number of worker processes. Up to n_jobs targets are trained concurrently, and
+                              any remaining workers are shared by each target's training. Default (-1) uses all
+                              cores.
+    - search (str, optional): The hyperparameter search of train_and_evaluate, 'grid' (default) or 'halving'.
+    - resource (str, optional): The successive halving budget, 'n_samples' (default) or 'n_estimators'.
+    - feature_store (str, optional): The root of the FeatureMatrixStore, which should not be shared with other
+                                     commands (only the current matrix is kept in it). Default is
+                                     <results_dir>/work/features.
+    - cache_dir (str, optional): The directory the nested CV fold matrices are cached in (see train_and_evaluate).
+
+    Returns:
+    - pd.DataFrame: One row per target with the number of documents and classes, the mean nested CV accuracy
+                    (and its standard deviation) and weighted F1, the training time and the paths of the results
+                    and pipeline.
+
+    Raises:
+    - KeyError: If a target is not a column of data.
+    - ValueError: If data and text do not share the same index.
+    """
+
+    missing = [target_name for target_name in targets if target_name not in data.columns]
+    if missing:
+        error_message = f"{missing} not found in DataFrame columns."
+        logging.error(error_message)
+        raise KeyError(error_message)
+    if not data.index.equals(text.index):
+        error_message = "data and text must share the same index."
+        logging.error(error_message)
+        raise ValueError(error_message)
+
+    setup = training_and_eval_setup()
+    work_dir = os.path.join(results_dir, 'work')
+    os.makedirs(work_dir, exist_ok=True)
+
+    # Write the shared inputs once
+    pd.DataFrame({'text': text}).to_parquet(os.path.join(work_dir, 'text.parquet'))
+    data[list(targets)].to_parquet(os.path.join(work_dir, 'targets.parquet'))
+    store_root = feature_store or os.path.join(work_dir, 'features')
+    store = FeatureMatrixStore(store_root)
+    version = store.get_or_build(text, setup['vectorizer'])['version']
+    store.prune(keep=[version])
+
+    # Workers train one target each, and the cores left over are shared by each target's own training
+    n_cores = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    n_workers = min(len(targets), n_cores)
+    target_n_jobs = max(1, n_cores // n_workers)
+    summary = Parallel(n_jobs=n_workers)(
+        delayed(_train_target)(
+            target_name, options, work_dir, store_root, version, setup, results_dir, target_n_jobs, search,
+            resource, cache_dir
+            )
+        for target_name, options in targets.items()
+        )
+
+    summary = pd.DataFrame(summary)
+    for row in summary.itertuples():
+        logging.info(f"Target {row.target}: nested CV accuracy {row.accuracy:.3f} (+/- {row.accuracy_std:.3f}), "
+                     f"weighted F1 {row.f1:.3f} on {row.documents} documents")
+    return summary
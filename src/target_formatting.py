@@ -1,23 +1,157 @@
 import pandas as pd
+import numpy as np
 from typing import List
 import logging
 import os
+import hashlib
+import warnings
 from src.validators import check_type, data_integrity_check
 from src.config import load_config
 
 # Config logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Load configuration
-config = load_config()
 
+class LabelRemapping:
+    """
+    A label remapping loaded from a CSV file with 'value' and 'mapping' columns. The mapping dict and its
+    normalised (stripped, lower-case) keys are built once when the file is loaded.
+
+    Parameters:
+    - path (str): The path of the CSV file.
+
+    Raises:
+    - KeyError: If the file does not have 'value' and 'mapping' columns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.digest = _file_digest(path)
+
+        try:
+            mapping_df = pd.read_csv(path, delimiter=',')
+            mapping_df.columns = mapping_df.columns.str.strip()
+        except Exception as e:
+            logging.error(f"Error loading CSV file: {e}")
+            raise
+
+        missing = [column for column in ('value', 'mapping') if column not in mapping_df.columns]
+        if missing:
+            error_message = f"{missing} not found in the columns of {path}."
+            logging.error(error_message)
+            raise KeyError(error_message)
+        duplicated = mapping_df['value'][mapping_df['value'].duplicated()]
+        if not duplicated.empty:
+            warnings.warn(f"Values mapped more than once in {path} (the last mapping is used): "
+                          f"{sorted(duplicated.astype(str).unique())}")
+
+        self.mapping = mapping_df.set_index('value')['mapping'].to_dict()
+        self.normalised_mapping = {
+            key.strip().lower() if isinstance(key, str) else key: value for key, value in self.mapping.items()
+            }
+
+    def apply(self, values: pd.Series, normalise: bool = False) -> tuple:
+        """
+        Remaps values. Each distinct value is looked up once and the result is broadcast back to the rows, so the
+        values without a mapping are found from the distinct values rather than by another pass over the rows.
+
+        Parameters:
+        - values (pd.Series): The values to be remapped.
+        - normalise (bool, optional): If True, values are matched to the mapping on their stripped, lower-case
+                                      form. Default is False (exact match).
+
+        Returns:
+        - tuple: The remapped Series (NaN where no mapping exists) and a list of the values without a mapping.
+        """
+
+        codes, uniques = pd.factorize(values)
+        if normalise:
+            mapping = self.normalised_mapping
+            keys = [value.strip().lower() if isinstance(value, str) else value for value in uniques]
+        else:
+            mapping = self.mapping
+            keys = uniques
+        remapped = np.array([mapping.get(key, np.nan) for key in keys], dtype=object)
+        unmapped = [value for value, key in zip(uniques, keys) if key not in mapping]
+
+        remapped = np.append(remapped, np.nan)  # code -1 (NaN) stays NaN
+        remapped = pd.Series(remapped[codes], index=values.index, name=values.name).infer_objects()
+        return remapped, unmapped
+
+
+def _file_digest(path: str) -> str:
+    """Returns a hash of the contents of the file at path."""
+
+    with open(path, 'rb') as file:
+        return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
+
+class RemappingRegistry:
+    """
+    Keeps loaded label remappings by path. A remapping is reloaded only when its file has changed: the file's
+    modification time and size are checked on every lookup, and if either changed the contents are hashed and
+    compared with the loaded version.
+    """
+
+    def __init__(self):
+        self._remappings = {}
+
+    def get(self, path: str) -> LabelRemapping:
+        """
+        Returns the remapping stored at path, loading it if it is not loaded yet or the file has changed.
+
+        Raises:
+        - FileNotFoundError: If the CSV file cannot be found at path.
+        """
+
+        if not os.path.exists(path):
+            error_message = f"The CSV file cannot be found at the provided directory: {path}"
+            logging.error(error_message)
+            raise FileNotFoundError(error_message)
+
+        remapping = self._remappings.get(path)
+        if remapping is not None:
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) == (remapping.mtime_ns, remapping.size):
+                return remapping
+            if _file_digest(path) == remapping.digest:
+                remapping.mtime_ns, remapping.size = stat.st_mtime_ns, stat.st_size
+                return remapping
+            logging.info(f"Label remapping at {path} changed. Reloading.")
+
+        remapping = LabelRemapping(path)
+        self._remappings[path] = remapping
+        return remapping
+
+    def clear(self):
+        """Forgets all loaded remappings."""
+
+        self._remappings.clear()
 
-def apply_value_mapping(values: pd.Series)-> pd.Series:
+
+_remapping_registry = RemappingRegistry()
+
+
+def get_label_remapping(path: str = None) -> LabelRemapping:
+    """Returns the remapping at path (default: the configured label_remappings) from the shared registry."""
+
+    return _remapping_registry.get(path or load_config().label_remappings)
+
+
+def apply_value_mapping(values: pd.Series, normalise: bool = False)-> pd.Series:
     """
     Replaces values in pd.Series with corresponding values from a CSV file mapping.
 
+    The mapping is loaded once and reused until the CSV file changes (see RemappingRegistry). Values without a
+    mapping become NaN and are reported in a warning.
+
     Parameters:
     - values (pd.Series): The Series containing the values to be transformed.
+    - normalise (bool, optional): If True, values are matched on their stripped, lower-case form. Default is
+                                  False.
 
     Returns:
     - pd.Series: A Series containing remapped values.
@@ -26,27 +160,16 @@ def apply_value_mapping(values: pd.Series)-> pd.Series:
     - FileNotFoundError: If the CSV file cannot be found at the provided directory.
     """
 
-    # Check the path to mapping file exists
-    if not os.path.exists(config.label_remappings):
-        error_message = f"The CSV file cannot be found at the provided directory: {config.label_remappings}"
-        logging.error(error_message)
-        raise FileNotFoundError(error_message)
+    remapping = get_label_remapping()
 
-    # Load remapping CSV file
-    try:
-        mapping_df = pd.read_csv(config.label_remappings, delimiter=',')
-        mapping_df.columns = mapping_df.columns.str.strip()
-    except Exception as e:
-        logging.error(f"Error loading CSV file: {e}")
-        raise
-    
     # Replace values in target_name column with corresponding values in remapping file
     try:
-        mapping_dict = mapping_df.set_index('value')['mapping'].to_dict() # Convert mapping CSV file (as DataFrame) to dict
-        target_remapped = values.map(mapping_dict) # Perform the remapping
+        target_remapped, unmapped = remapping.apply(values, normalise=normalise)
     except Exception as e:
         logging.error(f"Error during the mapping process: {e}")
         raise
+    if unmapped:
+        warnings.warn(f"{len(unmapped)} values have no mapping in {remapping.path}: {unmapped[:10]}")
     return target_remapped
 
 
@@ -54,7 +177,8 @@ def target_mapping(
         dataframe: pd.DataFrame,
         target_name: str,
         ignored_values: List = None,
-        remap_target: bool = False
+        remap_target: bool = False,
+        encode: bool = False
         ) -> pd.Series:
     """
     Extracts a target variable from available columns in a supplied DataFrame and optionally remaps its values.
@@ -65,9 +189,11 @@ def target_mapping(
     - target_name (str): The name of the target variable.
     - ignored_values (List, optional): A list of values to be ignored/removed within the target variable.
     - remap_target (bool, optional): If True, remaps values in the target column. Default is False.
+    - encode (bool, optional): If True, the labels are encoded once as integer codes and returned as a categorical
+                               Series (see encoded_target_mapping). Default is False.
 
     Returns:
-    - pd.Series: A Series containing the processed target variable.
+    - pd.Series: A Series containing the processed target variable (categorical if encode is True).
 
     Raises:
     - KeyError: If `target_name` is not found in the DataFrame's columns.
@@ -89,7 +215,7 @@ def target_mapping(
         raise KeyError(error_message)
     
     # ValueError checks
-    if remap_target and config.label_remappings is None:
+    if remap_target and load_config().label_remappings is None:
         error_message = "remap_target set to True, but remap directory is blank."
         logging.error(error_message)
         raise ValueError(error_message)
@@ -107,6 +233,11 @@ def target_mapping(
         logging.error(error_message)
         raise ValueError
 
+    if encode:
+        target = encoded_target_mapping(target, ignored_values=ignored_values, remap_target=remap_target)
+        data_integrity_check(target)
+        return target
+
     # Remap column values if remapping = True
     if remap_target == True:
         target = apply_value_mapping(values=target)
@@ -124,3 +255,50 @@ def target_mapping(
     return target
 
 
+def encoded_target_mapping(
+        target: pd.Series,
+        ignored_values: List = None,
+        remap_target: bool = False
+        ) -> pd.Series:
+    """
+    Encodes target labels as integer codes and applies the remapping, normalisation (stripped, lower-case) and
+    ignored values to the table of distinct labels rather than to every row. Remapping becomes a code-to-code lookup
+    array and ignored values are filtered by code.
+
+    Parameters:
+    - target (pd.Series): The target values, without NaNs.
+    - ignored_values (List, optional): A list of values to be ignored/removed within the target variable.
+    - remap_target (bool, optional): If True, remaps the labels with apply_value_mapping. Default is False.
+
+    Returns:
+    - pd.Series: A categorical Series indexed like target. Its codes (.cat.codes) index the label table
+                 (.cat.categories). Rows whose label has no mapping, or is not a string, are removed (and counted
+                 in a warning) like rows whose label is ignored.
+    """
+
+    # Encode the labels once
+    codes, labels = pd.factorize(target)
+    labels = pd.Series(labels)
+
+    # Remap and normalise the label table only
+    if remap_target:
+        labels = apply_value_mapping(values=labels)
+    labels = labels.str.strip().str.lower()
+
+    # Labels that become identical after remapping share a code
+    ignored = np.zeros(len(labels), dtype=bool)
+    if isinstance(ignored_values, List):
+        ignored = labels.isin([x.strip().lower() for x in ignored_values]).to_numpy()
+    lookup, categories = pd.factorize(labels.mask(ignored))
+
+    # Labels without a mapping (NaN) would otherwise become an extra class with code -1
+    missing = (lookup == -1) & ~ignored
+    if missing[codes].any():
+        logging.warning(f"{missing[codes].sum()} rows of {target.name} removed: {missing.sum()} labels have no "
+                        f"mapping or are not strings.")
+
+    # Recode the rows with the lookup array and drop the rows whose label is ignored or missing
+    keep = lookup[codes] != -1
+    codes = lookup[codes[keep]]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=target.index[keep],
+                     name=target.name)
@@ -1,70 +1,278 @@
 import pandas as pd
 import re
-from nltk.stem.porter import PorterStemmer
-from nltk.corpus import stopwords
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, lru_cache
 import logging
-from src.text_utils import ensure_nltk_resources
+from src.text_utils import ensure_nltk_resources, StemCache
 
 
 # Config logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Check stopwords are available
-ensure_nltk_resources()
-stop_words = set(stopwords.words('english'))
 
-# Init stemmer
-stemmer = PorterStemmer()
+@lru_cache(maxsize=None)
+def get_stop_words() -> frozenset:
+    """Returns the English stopword set, checking the NLTK stopwords are available on first use."""
 
+    from nltk.corpus import stopwords
 
-def basic_cleaning(
+    ensure_nltk_resources()
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    """Returns the shared Porter stemmer, created on first use."""
+
+    from nltk.stem.porter import PorterStemmer
+
+    return PorterStemmer()
+
+
+# Punctuation and digit pattern removed by basic_cleaning (compiled once at import).
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]|(\d+)')
+
+# Equivalent of PUNCTUATION_PATTERN for lower-cased text, written for the RE2 engine used by Arrow (whose \w,
+# \d and \s classes differ from Python's). It keeps letters, non-decimal numerics, underscores and whitespace.
+ARROW_PUNCTUATION_PATTERN = r'[^\p{L}\p{Nl}\p{No}_\t\n\x0b\x0c\r\x1c-\x1f\x85\p{Z}]'
+
+# Matches characters outside the ranges where Arrow's Unicode tables agree with Python's (Latin scripts,
+# general punctuation and currency symbols). Rows containing them are cleaned by the python engine. The range
+# ends are literal characters, so the pattern is valid for both RE2 and Python's re (which pandas uses to check
+# str.contains patterns).
+ARROW_UNSAFE_PATTERN = '[^\\x00-\u024f\u2000-\u20cf]'
+
+
+def _python_basic_cleaning(
+        data: pd.Series
+        ) -> pd.Series:
+    """Lower-cases text and removes punctuation using Python's re engine."""
+
+    return data.str.lower().str.replace(PUNCTUATION_PATTERN, '', regex=True)
+
+
+def _arrow_basic_cleaning(
         data: pd.Series
         ) -> pd.Series:
     """
+    Lower-cases text and removes punctuation in bulk on an Arrow-backed string array. Rows containing characters
+    outside the Latin/punctuation ranges fall back to the Python path, so the output matches 
+    _python_basic_cleaning.
+    """
+
+    try:
+        arrow_data = data.astype('string[pyarrow]')
+    except ImportError:
+        logging.warning("pyarrow is not installed; falling back to the python engine for basic_cleaning.")
+        return _python_basic_cleaning(data)
+
+    cleaned_data = (arrow_data.str.lower()
+                    .str.replace(ARROW_PUNCTUATION_PATTERN, '', regex=True)
+                    .astype(object))
+
+    # Re-clean rows where Arrow's and Python's Unicode handling may differ
+    unsafe = arrow_data.str.contains(ARROW_UNSAFE_PATTERN, regex=True).to_numpy(dtype=bool, na_value=False)
+    if unsafe.any():
+        cleaned_data[unsafe] = _python_basic_cleaning(data[unsafe]).to_numpy()
+
+    # Missing values are passed through unchanged, as by the python engine (rather than becoming pd.NA)
+    missing = data.isna().to_numpy()
+    if missing.any():
+        cleaned_data[missing] = data[missing].to_numpy()
+
+    return cleaned_data
+
+
+def basic_cleaning(
+        data: pd.Series,
+        engine: str = 'python'
+        ) -> pd.Series:
+    """
     Performs basic cleaning steps (convert text to lower-case and remove punctuation).
 
     Parameters:
     - data (pd.Series): A pandas Series containing text-values.
+    - engine (str, optional): 'python' (default) uses Python's re engine. 'arrow' runs both steps in bulk on an 
+                              Arrow-backed string dtype, falling back to the python engine for rows outside the
+                              Latin/punctuation ranges or when pyarrow is not installed. Both engines give
+                              identical output, and missing values are passed through.
 
     Returns:
     - cleaned_data: A pandas Series with converted text.
+
+    Raises:
+    - ValueError: If engine is not recognised.
     """
-    
-    # Convert text to lower-case.
-    cleaned_data = data.str.lower()
 
-    # Remove punctuation.
-    cleaned_data = cleaned_data.apply(lambda x: re.sub(r'[^\w\s]|(\d+)', '', x))
+    if engine == 'python':
+        return _python_basic_cleaning(data)
+    if engine == 'arrow':
+        return _arrow_basic_cleaning(data)
+    raise ValueError("engine must be either 'python' or 'arrow'.")
 
-    return cleaned_data
+
+def fused_token_cleaning(
+        data: pd.Series,
+        stem_cache: StemCache
+        ) -> pd.Series:
+    """
+    Removes stopwords and stems the remaining tokens in a single pass over each document. Stems are looked up
+    through stem_cache, so each distinct word is only stemmed once.
+
+    Parameters:
+    - data (pd.Series): A pandas Series containing basic-cleaned text values.
+    - stem_cache (StemCache): The cache used to stem tokens.
+
+    Returns:
+    - data (pd.Series): A pandas Series containing cleaned text values.
+    """
+
+    stem = stem_cache.stem
+    stop_words = get_stop_words()
+    return data.apply(lambda x: ' '.join([stem(word) for word in x.split() if word not in stop_words]))
+
+
+def _clean_chunk(
+        data: pd.Series,
+        engine: str = 'standard',
+        stem_cache: StemCache = None,
+        basic_engine: str = 'python'
+        ) -> pd.Series:
+    """
+    Applies the full cleaning sequence (basic cleaning, stopword removal and stemming) to a Series.
+
+    Parameters:
+    - data (pd.Series): A pandas Series containing text values.
+    - engine (str): 'standard' for separate stopword and stemming passes, or 'fused' for a single pass.
+    - stem_cache (StemCache): The cache used to stem tokens by the fused engine.
+    - basic_engine (str): The engine used by basic_cleaning ('python' or 'arrow').
+
+    Returns:
+    - data (pd.Series): A pandas Series containing cleaned text values.
+    """
+
+    # Basic cleaning steps
+    data = basic_cleaning(data=data, engine=basic_engine)
+
+    if engine == 'fused':
+        return fused_token_cleaning(data, stem_cache)
+
+    stop_words = get_stop_words()
+    stemmer = get_stemmer()
+
+    # Remove stopwords
+    data = data.apply(lambda x: ' '.join(word for word in x.split() if word not in stop_words))
+
+    # Stem remaining tokens
+    data = data.apply(lambda x: ' '.join(stemmer.stem(word) for word in x.split()))
+
+    return data
+
+
+def _clean_chunk_with_cache(
+        data: pd.Series,
+        engine: str,
+        stem_cache: StemCache,
+        basic_engine: str
+        ) -> tuple:
+    """Cleans a chunk in a worker process and returns the worker's copy of the stem cache alongside it."""
+
+    # Count only this chunk's lookups so counters are not double-counted when merged
+    stem_cache.hits = stem_cache.misses = 0
+    return _clean_chunk(data, engine=engine, stem_cache=stem_cache, basic_engine=basic_engine), stem_cache
+
+
+def _resolve_n_jobs(n_jobs: int) -> int:
+    """Converts an n_jobs value (where -1 means all cores) into a positive worker count."""
+
+    if not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1:
+        raise ValueError("n_jobs must be a positive integer or -1 (use all cores).")
+    if n_jobs == -1:
+        return os.cpu_count() or 1
+    return n_jobs
 
 
 def text_cleaning(
         data: pd.Series,
-        id_values = None
+        id_values = None,
+        n_jobs: int = 1,
+        chunk_size: int = None,
+        engine: str = 'standard',
+        stem_cache: StemCache = None,
+        basic_engine: str = 'python'
         ) -> pd.Series:
     """
     Cleans text in a pandas Series. Removes stopwords and stems the remaining tokens.
 
+    When n_jobs is greater than one, the Series is split into chunks that are cleaned in a process pool and 
+    joined back in their original order. The output is identical to the serial path.
+
+    The 'fused' engine tokenizes each document once, removing stopwords and stemming in the same pass, and 
+    stems through a bounded cache. Its output is identical to the 'standard' engine.
+
     Parameters:
     - data (pd.Series): A pandas Series containing text values.
-    - id_values: Index values corresponding to the rows to be processed (non-indexed values are removed).
+    - id_values: Index values corresponding to the rows to be processed (non-indexed values are removed). If None,
+                 all rows are processed.
+    - n_jobs (int, optional): The number of worker processes. Default is 1 (serial); -1 uses all cores.
+    - chunk_size (int, optional): The number of rows per chunk in parallel mode. Defaults to an even split 
+                                  giving four chunks per worker.
+    - engine (str, optional): 'standard' (default) or 'fused'.
+    - stem_cache (StemCache, optional): The stem cache used by the fused engine. A new cache is created if not 
+                                        provided. In parallel mode each worker uses a copy, and the entries and 
+                                        counters are merged back into stem_cache.
+    - basic_engine (str, optional): The basic_cleaning engine, 'python' (default) or 'arrow'.
 
     Returns:
     - data (pd.Series): A pandas Series containing cleaned text values
+
+    Raises:
+    - ValueError: If n_jobs, chunk_size, engine or basic_engine are invalid.
     """
     
     # Filter data with the indices present in id_values.
     # Note: this ensures target/feaures match downstream.
-    data = data.loc[id_values]
-    
-    # Basic cleaning steps
-    data = basic_cleaning(data=data)
+    if id_values is not None:
+        data = data.loc[id_values]
 
-    # Remove stopwords
-    data = data.apply(lambda x: ' '.join(word for word in x.split() if word not in stop_words))
+    n_workers = _resolve_n_jobs(n_jobs)
+    if chunk_size is not None and (not isinstance(chunk_size, int) or chunk_size < 1):
+        raise ValueError("chunk_size must be a positive integer.")
+    if engine not in ('standard', 'fused'):
+        raise ValueError("engine must be either 'standard' or 'fused'.")
+    if basic_engine not in ('python', 'arrow'):
+        raise ValueError("basic_engine must be either 'python' or 'arrow'.")
+    if engine == 'fused' and stem_cache is None:
+        stem_cache = StemCache(get_stemmer())
 
-    # Stem remaining tokens
-    data = data.apply(lambda x: ' '.join(stemmer.stem(word) for word in x.split()))
+    # Serial path
+    if n_workers == 1 or len(data) < 2:
+        data = _clean_chunk(data, engine=engine, stem_cache=stem_cache, basic_engine=basic_engine)
+        if engine == 'fused':
+            logging.info(f"Stem cache: {stem_cache.stats()}")
+        return data
+
+    # Split into contiguous chunks (positional, so duplicate index labels are preserved)
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(data) / (n_workers * 4)))
+    chunks = [data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+    # Clean chunks in a process pool; map() yields results in submission order.
+    n_workers = min(n_workers, len(chunks))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        if engine == 'fused':
+            worker = partial(
+                _clean_chunk_with_cache, engine=engine, stem_cache=stem_cache, basic_engine=basic_engine
+                )
+            results = list(executor.map(worker, chunks))
+            cleaned_chunks = [cleaned for cleaned, _ in results]
+            for _, worker_cache in results:
+                stem_cache.merge(worker_cache)
+            logging.info(f"Stem cache: {stem_cache.stats()}")
+        else:
+            cleaned_chunks = list(executor.map(partial(_clean_chunk, basic_engine=basic_engine), chunks))
+    logging.info(f"Cleaned {len(data)} rows in {len(chunks)} chunks using {n_workers} worker processes.")
 
-    return data
\ No newline at end of file
+    return pd.concat(cleaned_chunks)
@@ -1,6 +1,7 @@
-import nltk
 import os
+import json
 import logging
+from collections import OrderedDict
 
 # Config logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -8,8 +9,118 @@ logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %
 def ensure_nltk_resources():
     """Ensures necessary NLTK resources, such as stopwords, are downloaded"""
 
+    import nltk
+
     if not any(os.path.isdir(os.path.join(path, 'corpora', 'stopwords')) for path in nltk.data.path):
         nltk.download('stopwords')
         logging.info("NLTK stopwords have been downloaded.")
     else:
-        logging.info("Using existing NLTK stopwords download")
\ No newline at end of file
+        logging.info("Using existing NLTK stopwords download")
+
+class StemCache:
+    """
+    A bounded, least-recently-used cache of word stems.
+
+    Parameters:
+    - stemmer: An object exposing a stem(word) method (e.g. nltk's PorterStemmer).
+    - max_size (int): The maximum number of cached stems. The least recently used entries are evicted first.
+    """
+
+    def __init__(self, stemmer, max_size: int = 100_000):
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("max_size must be a positive integer.")
+        self.stemmer = stemmer
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stem(self, word: str) -> str:
+        """Returns the stem of word, computing and caching it on a miss."""
+
+        entries = self._entries
+        stemmed = entries.get(word)
+        if stemmed is not None:
+            self.hits += 1
+            entries.move_to_end(word)
+            return stemmed
+
+        self.misses += 1
+        stemmed = self.stemmer.stem(word)
+        entries[word] = stemmed
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return stemmed
+
+    @property
+    def hit_rate(self) -> float:
+        """The proportion of lookups served from the cache."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Returns a summary of cache usage."""
+
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate
+        }
+
+    def merge(self, other: 'StemCache'):
+        """Adds the entries and counters from another cache (e.g. one used by a worker process)."""
+
+        for word, stemmed in other._entries.items():
+            self._entries[word] = stemmed
+            self._entries.move_to_end(word)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self.hits += other.hits
+        self.misses += other.misses
+
+    def save(self, path: str):
+        """Saves the cached stems (least to most recently used) to a JSON file."""
+
+        payload = {
+            'stemmer': type(self.stemmer).__name__,
+            'entries': list(self._entries.items())
+        }
+        with open(path, 'w') as file:
+            json.dump(payload, file)
+        logging.info(f"Saved {len(self._entries)} cached stems to {path}")
+
+    @classmethod
+    def load(cls, path: str, stemmer, max_size: int = 100_000) -> 'StemCache':
+        """
+        Creates a cache preloaded with stems saved by StemCache.save.
+
+        Raises:
+        - FileNotFoundError: If no file exists at path.
+        - ValueError: If the file was produced by a different stemmer.
+        """
+
+        if not os.path.exists(path):
+            error_message = f"Stem cache file not found at: {path}"
+            logging.error(error_message)
+            raise FileNotFoundError(error_message)
+
+        with open(path, 'r') as file:
+            payload = json.load(file)
+        if payload.get('stemmer') != type(stemmer).__name__:
+            error_message = (f"Stem cache at {path} was built with {payload.get('stemmer')}, "
+                             f"not {type(stemmer).__name__}.")
+            logging.error(error_message)
+            raise ValueError(error_message)
+
+        cache = cls(stemmer, max_size=max_size)
+        # Keep the most recently used entries if the saved cache is larger than max_size
+        for word, stemmed in payload['entries'][-max_size:]:
+            cache._entries[word] = stemmed
+        logging.info(f"Loaded {len(cache)} cached stems from {path}")
+        return cache
@@ -1,31 +1,64 @@
 import pandas as pd
+import numpy as np
+import logging
+import os
+import math
+import tempfile
+import time
+import joblib
+from joblib import Parallel, delayed, Memory
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import KFold, GridSearchCV
+from sklearn.model_selection import KFold, ParameterGrid
 from sklearn.metrics import accuracy_score, precision_recall_fscore_support
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from typing import Callable, Iterable
+from src.feature_engineering import EmbeddingFeatureExtractor, StreamingFeatureExtractor
+from src.model_compaction import compact_pipeline
 
-def training_and_eval_setup():
+# Config logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def training_and_eval_setup(
+        seed: int = 42,
+        features: str = 'tfidf',
+        vectors_dir: str = None,
+        vectorizer_params: dict = None
+        ) -> dict:
     """
     Setup training and evaluation strategy.
-    
+
+    Parameters:
+    - seed (int): The random seed used by the classifier and the CV splitters.
+    - features (str, optional): The document features, 'tfidf' (default), or pooled 'word2vec' or 'fasttext' word
+                                vectors (see EmbeddingFeatureExtractor).
+    - vectors_dir (str, optional): The directory word vectors are saved to and memory-mapped from.
+    - vectorizer_params (dict, optional): Keyword arguments of the TfidfVectorizer, e.g. from
+                                          compact_vectorizer_params.
+
     Returns:
-    - param_grid (dict): A dictionary containing CV grid parameters
+    - setup (dict): A dictionary containing the vectorizer, classifier, inner and outer CV splitters and the CV
+                    grid parameters (keys: 'vectorizer', 'classifier', 'inner_cv', 'outer_cv', 'param_grid')
     """
 
-    # Set seed value
-    seed = 42
-    
     # Init training and evaluation components
-    tfidf_vectorizer = TfidfVectorizer()
+    if features == 'tfidf':
+        vectorizer = TfidfVectorizer(**(vectorizer_params or {}))
+    elif features in ('word2vec', 'fasttext'):
+        vectorizer = EmbeddingFeatureExtractor(model=features, vectors_dir=vectors_dir, seed=seed)
+    else:
+        raise ValueError("features must be one of 'tfidf', 'word2vec' or 'fasttext'.")
     rf = RandomForestClassifier(random_state=seed)
     inner_cv = KFold(
-        n_splits=3, 
-        shuffle=True, 
+        n_splits=3,
+        shuffle=True,
         random_state=seed
         )
     outer_cv = KFold(
-        n_splits=10, 
-        shuffle=True, 
+        n_splits=10,
+        shuffle=True,
         random_state=seed
         )
 
@@ -37,14 +70,555 @@ def training_and_eval_setup():
         'min_samples_leaf': [1, 2],
     }
 
-    return param_grid
+    return {
+        'vectorizer': vectorizer,
+        'classifier': rf,
+        'inner_cv': inner_cv,
+        'outer_cv': outer_cv,
+        'param_grid': param_grid
+    }
+
+
+def _vectorize_fold(vectorizer, X_train: np.ndarray, X_test: np.ndarray) -> tuple:
+    """Fits a copy of the vectorizer on the training texts of a fold and transforms both sides of the split."""
+
+    vectorizer = clone(vectorizer)
+    return vectorizer, vectorizer.fit_transform(X_train), vectorizer.transform(X_test)
+
+
+def _fold_matrices(vectorizer, X_train: np.ndarray, X_test: np.ndarray) -> tuple:
+    """
+    Fits a copy of the vectorizer on the training texts of a fold and returns only the matrices of both sides, so
+    the fitted fold vectorizer (e.g. its word vectors) is neither sent back from a worker nor cached.
+    """
+
+    return _vectorize_fold(vectorizer, X_train, X_test)[1:]
+
+
+def _fit_and_score(classifier, params: dict, X_train, y_train, X_test, y_test) -> tuple:
+    """Fits a copy of the classifier with params and returns its accuracy on the test split and the fit time."""
+
+    start = time.perf_counter()
+    model = clone(classifier).set_params(**params)
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    return accuracy_score(y_test, model.predict(X_test)), fit_time
+
+
+def _fit_and_evaluate(classifier, params: dict, X_train, y_train, X_test, y_test) -> dict:
+    """Fits a copy of the classifier with params and returns its test metrics (weighted averages)."""
+
+    model = clone(classifier).set_params(**params)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_test, y_pred, average='weighted', zero_division=0
+        )
+    return {'accuracy': accuracy_score(y_test, y_pred), 'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def _training_labels(y: pd.Series) -> tuple:
+    """
+    Returns the labels a classifier is trained on and their names: the integer codes and categories of a
+    categorical target, otherwise the values themselves (and None).
+
+    Raises:
+    - ValueError: If a categorical target contains missing labels (code -1).
+    """
+
+    if not isinstance(y.dtype, pd.CategoricalDtype):
+        return y.to_numpy(), None
+    codes = y.cat.codes.to_numpy()
+    if (codes == -1).any():
+        error_message = f"{y.name} contains {(codes == -1).sum()} missing labels."
+        logging.error(error_message)
+        raise ValueError(error_message)
+    return codes, y.cat.categories.to_numpy()
+
+
+def _matrix_nbytes(matrix) -> int:
+    """Returns the memory used by a dense or sparse (CSR/CSC) matrix."""
+
+    if hasattr(matrix, 'indptr'):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return np.asarray(matrix).nbytes
+
+
+def _effective_n_jobs(n_jobs: int, memory_limit: int, bytes_per_worker: int) -> int:
+    """
+    Caps the number of workers so that their estimated memory use stays within memory_limit (bytes). n_jobs=-1
+    uses all cores.
+    """
+
+    n_workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    if memory_limit is not None and bytes_per_worker > 0:
+        n_workers = min(n_workers, max(1, memory_limit // bytes_per_worker))
+    return n_workers
+
+
+def _score_candidates(
+        classifier,
+        candidates: list,
+        fold_features: list,
+        y: np.ndarray,
+        inner_splits: list,
+        parallel: Parallel,
+        n_samples: int = None,
+        seed: int = 42
+        ) -> tuple:
+    """
+    Scores each candidate parameter set on every inner fold, reusing the cached fold matrices. If n_samples is
+    given, each model is trained on a fixed random subsample of that many training rows.
+
+    Returns:
+    - tuple: Arrays of accuracies and fit times, each with shape (len(candidates), len(inner_splits)).
+    """
+
+    subsamples = [
+        np.sort(np.random.RandomState(seed).permutation(len(train_idx))[:n_samples]) if n_samples
+        else np.arange(len(train_idx))
+        for train_idx, _ in inner_splits
+        ]
+    results = parallel(
+        delayed(_fit_and_score)(
+            classifier, params, X_train[subsample], y[train_idx][subsample], X_val, y[val_idx]
+            )
+        for params in candidates
+        for (X_train, X_val), (train_idx, val_idx), subsample in zip(fold_features, inner_splits, subsamples)
+        )
+    scores, fit_times = (np.asarray(values).reshape(len(candidates), len(inner_splits)) for values in zip(*results))
+    return scores, fit_times
+
+
+def _grid_search(
+        classifier,
+        param_grid: dict,
+        fold_features: list,
+        y: np.ndarray,
+        inner_splits: list,
+        parallel: Parallel
+        ) -> tuple:
+    """
+    Scores every point of the grid on every inner fold.
+
+    Returns:
+    - tuple: The best parameters, their mean inner CV accuracy and a search report.
+    """
+
+    start = time.perf_counter()
+    candidates = list(ParameterGrid(param_grid))
+    scores, _ = _score_candidates(classifier, candidates, fold_features, y, inner_splits, parallel)
+    best = int(np.argmax(scores.mean(axis=1)))
+    return candidates[best], scores[best].mean(), {'search_time': time.perf_counter() - start}
+
+
+def _successive_halving(
+        classifier,
+        param_grid: dict,
+        fold_features: list,
+        y: np.ndarray,
+        inner_splits: list,
+        parallel: Parallel,
+        resource: str = 'n_samples',
+        factor: int = 3,
+        min_resources: int = None,
+        seed: int = 42
+        ) -> tuple:
+    """
+    Searches the grid with successive halving. All candidates are first scored with a small budget (training rows
+    or trees); at each rung only the best 1/factor of candidates are kept and the budget is multiplied by factor,
+    so that the final rung scores the survivors with the full budget.
+
+    Parameters:
+    - resource (str): 'n_samples' (training rows per inner fold) or 'n_estimators' (trees; n_estimators is then
+                      taken out of the grid and its largest value is the full budget).
+    - factor (int): The proportion of candidates kept (1/factor) and the budget growth at each rung.
+    - min_resources (int, optional): The budget of the first rung. By default it is chosen so that the number of
+                                     rungs reduces the grid to about one candidate.
+
+    Returns:
+    - tuple: The best parameters, their mean inner CV accuracy and a search report with the rungs (budget,
+             number of candidates and pruned configurations), the search time, and estimates (from the
+             first rung's fit times) of the time of the full grid and the time saved.
+    """
+
+    start = time.perf_counter()
+    full_grid = list(ParameterGrid(param_grid))
+    param_grid = dict(param_grid)
+    if resource == 'n_estimators':
+        max_resources = max(param_grid.pop('n_estimators', [classifier.get_params()['n_estimators']]))
+    elif resource == 'n_samples':
+        max_resources = min(len(train_idx) for train_idx, _ in inner_splits)
+    else:
+        raise ValueError("resource must be either 'n_samples' or 'n_estimators'.")
+
+    candidates = list(ParameterGrid(param_grid))
+    if min_resources is None:
+        n_rungs = math.ceil(math.log(len(candidates), factor)) + 1 if len(candidates) > 1 else 1
+        min_resources = max(1, max_resources // factor ** (n_rungs - 1))
+    n_rungs = int(math.floor(math.log(max(max_resources / min_resources, 1), factor))) + 1
+
+    rungs = []
+    total_fit_time = 0.0
+    first_rung = None
+    for rung in range(n_rungs):
+        budget = max_resources if rung == n_rungs - 1 else int(min_resources * factor ** rung)
+        if resource == 'n_estimators':
+            rung_candidates = [{**params, 'n_estimators': budget} for params in candidates]
+            scores, fit_times = _score_candidates(
+                classifier, rung_candidates, fold_features, y, inner_splits, parallel
+                )
+        else:
+            scores, fit_times = _score_candidates(
+                classifier, candidates, fold_features, y, inner_splits, parallel, n_samples=budget, seed=seed
+                )
+
+        mean_scores = scores.mean(axis=1)
+        order = np.argsort(-mean_scores, kind='stable')
+        n_keep = 1 if rung == n_rungs - 1 else max(1, math.ceil(len(candidates) / factor))
+        rungs.append({
+            'rung': rung,
+            resource: budget,
+            'n_candidates': len(candidates),
+            'pruned': [{'params': candidates[i], 'inner_cv_accuracy': mean_scores[i]} for i in order[n_keep:]]
+        })
+        logging.info(f"Successive halving rung {rung}: {len(candidates)} candidates with {resource}={budget}, "
+                     f"{len(candidates) - n_keep} pruned.")
+
+        best_score = mean_scores[order[0]]
+        if first_rung is None:
+            first_rung = (list(candidates), budget, fit_times.sum(axis=1))
+        total_fit_time += fit_times.sum()
+        candidates = [candidates[i] for i in order[:n_keep]]
+
+    best_params = candidates[0]
+    if resource == 'n_estimators':
+        best_params = {**best_params, 'n_estimators': max_resources}
+
+    # Estimate the cost of the full grid from the fit times of every candidate in the first rung, scaled from
+    # its budget to each grid point's full budget (fit time is assumed to grow linearly with the number of
+    # training rows or trees), then by the observed wall time per second of fitting (which accounts for
+    # parallelism and overheads). Unlike the survivors of later rungs, the first rung covers the whole grid.
+    search_time = time.perf_counter() - start
+    first_candidates, first_budget, first_fit_times = first_rung
+    if resource == 'n_estimators':
+        fit_time_per_tree = {tuple(sorted(params.items())): fit_time / first_budget
+                             for params, fit_time in zip(first_candidates, first_fit_times)}
+        grid_fit_time = sum(
+            fit_time_per_tree[tuple(sorted((k, v) for k, v in params.items() if k != 'n_estimators'))]
+            * params.get('n_estimators', max_resources)
+            for params in full_grid
+            )
+    else:
+        grid_fit_time = first_fit_times.sum() * max_resources / first_budget
+    estimated_grid_time = grid_fit_time * search_time / total_fit_time if total_fit_time else 0.0
+    report = {
+        'search_time': search_time,
+        'estimated_grid_time': estimated_grid_time,
+        'estimated_time_saved': estimated_grid_time - search_time,
+        'rungs': rungs
+    }
+    return best_params, best_score, report
 
 
 def train_and_evaluate(X: pd.Series,
-                       y = pd.Series):
+                       y: pd.Series,
+                       setup: dict = None,
+                       n_jobs: int = -1,
+                       memory_limit: int = None,
+                       cache_dir: str = None,
+                       cache_bytes_limit: str = '2G',
+                       search: str = 'grid',
+                       resource: str = 'n_samples',
+                       factor: int = 3
+                       ) -> pd.DataFrame:
+    """
+    Trains and evaluates the classifier with nested cross-validation. For each outer fold, the grid of
+    parameters is searched with the inner CV and the best parameters are refitted on the outer training split
+    and evaluated on the outer test split.
+
+    The vectorizer is fitted inside each fold (so no test data leaks into it). The transformed matrices are cached
+    per fold and shared by every grid point, so texts are tokenized once per fold. The inner folds and grid points
+    of each outer fold run in parallel.
+
+    With search='halving', the grid is searched with successive halving instead of exhaustively: candidates are
+    scored with a small budget (training rows or trees) and only the best 1/factor advance to the next rung with
+    a budget factor times larger. The time saved against an estimate of the full grid, and the configurations
+    pruned at each rung, are reported.
+
+    Parameters:
+    - X (pd.Series): A pandas Series containing cleaned text values.
+    - y (pd.Series): A pandas Series containing the target values (with the same index as X), e.g. a categorical
+                     Series returned by target_mapping with encode=True.
+    - setup (dict, optional): The components returned by training_and_eval_setup (created if not provided).
+    - n_jobs (int, optional): The number of worker processes. Default (-1) uses all cores.
+    - memory_limit (int, optional): An approximate memory budget in bytes. The number of workers is reduced so
+                                    that the estimated per-worker memory fits within it.
+    - cache_dir (str, optional): If provided, the fold matrices are also cached on disk and reused (memory-mapped
+                                 read-only) by later runs on the same data.
+    - cache_bytes_limit (str, optional): The size the cache is reduced to after the run, by removing the least
+                                         recently used fold matrices (a number of bytes or e.g. '2G', the default).
+    - search (str, optional): 'grid' (default) for an exhaustive grid search or 'halving' for successive halving.
+    - resource (str, optional): The budget used by successive halving, 'n_samples' (default) or 'n_estimators'.
+    - factor (int, optional): The successive halving reduction factor. Default is 3.
+
+    Returns:
+    - results (pd.DataFrame): One row per outer fold with the selected parameters, the mean inner CV accuracy,
+                              the outer test accuracy, precision, recall and F1 (weighted averages) and the search
+                              time. Successive halving also reports the estimated full grid time, the time saved
+                              and the pruned configurations of each rung ('rungs').
+
+    Raises:
+    - ValueError: If X and y do not share the same index, or search or resource are not recognised.
+    """
+
+    if not X.index.equals(y.index):
+        error_message = "X and y must share the same index."
+        logging.error(error_message)
+        raise ValueError(error_message)
+    if search not in ('grid', 'halving'):
+        raise ValueError("search must be either 'grid' or 'halving'.")
+
+    if setup is None:
+        setup = training_and_eval_setup()
+
+    texts = X.to_numpy(dtype=object)
+    # Categorical targets are trained and scored on their integer codes
+    labels, _ = _training_labels(y)
+    text_bytes = sum(len(text) for text in texts)
+    vectorize = _fold_matrices
+    memory = Memory(cache_dir, mmap_mode='r', verbose=0) if cache_dir else None
+    if memory is not None:
+        vectorize = memory.cache(_fold_matrices)
+
+    # Fold vectorizers are only used for their matrices, so word vectors trained in folds are kept in memory
+    # rather than saved to vectors_dir (which would keep a vector set for every fold)
+    fold_vectorizer = setup['vectorizer']
+    if fold_vectorizer.get_params().get('vectors_dir') is not None:
+        fold_vectorizer = clone(fold_vectorizer).set_params(vectors_dir=None)
+
+    results = []
+    for fold, (outer_train, outer_test) in enumerate(setup['outer_cv'].split(texts)):
+        inner_splits = list(setup['inner_cv'].split(outer_train))
+
+        # Fit the vectorizer once per inner fold and once for the outer split
+        fold_splits = [(texts[outer_train][train_idx], texts[outer_train][val_idx])
+                       for train_idx, val_idx in inner_splits]
+        fold_splits.append((texts[outer_train], texts[outer_test]))
+        with Parallel(n_jobs=_effective_n_jobs(n_jobs, memory_limit, text_bytes)) as parallel:
+            fold_features = parallel(
+                delayed(vectorize)(fold_vectorizer, X_train, X_test) for X_train, X_test in fold_splits
+                )
+        X_outer_train, X_outer_test = fold_features.pop()
+
+        # Search the grid on the cached inner fold matrices
+        bytes_per_worker = 2 * max(_matrix_nbytes(X_train) for X_train, _ in fold_features)
+        with Parallel(n_jobs=_effective_n_jobs(n_jobs, memory_limit, bytes_per_worker)) as parallel:
+            if search == 'halving':
+                best_params, best_score, report = _successive_halving(
+                    setup['classifier'], setup['param_grid'], fold_features, labels[outer_train], inner_splits,
+                    parallel, resource=resource, factor=factor
+                    )
+                logging.info(f"Outer fold {fold}: successive halving took {report['search_time']:.1f}s, saving "
+                             f"an estimated {report['estimated_time_saved']:.1f}s against the full grid.")
+            else:
+                best_params, best_score, report = _grid_search(
+                    setup['classifier'], setup['param_grid'], fold_features, labels[outer_train], inner_splits,
+                    parallel
+                    )
+
+        # Refit the best parameters on the outer training split and evaluate on the outer test split
+        metrics = _fit_and_evaluate(
+            setup['classifier'], best_params,
+            X_outer_train, labels[outer_train], X_outer_test, labels[outer_test]
+            )
+        results.append({'fold': fold, 'best_params': best_params,
+                        'inner_cv_accuracy': best_score, **metrics, **report})
+        logging.info(f"Outer fold {fold}: best parameters {best_params}, "
+                     f"test accuracy {metrics['accuracy']:.3f}, weighted F1 {metrics['f1']:.3f}")
+
+    # Every change to the data or parameters adds fold matrices to the cache, so it is bounded after each run
+    if memory is not None:
+        memory.reduce_size(bytes_limit=cache_bytes_limit)
+
+    results = pd.DataFrame(results)
+    logging.info(f"Nested CV accuracy: {results['accuracy'].mean():.3f} (+/- {results['accuracy'].std():.3f}), "
+                 f"weighted F1: {results['f1'].mean():.3f}")
+    return results
+
+
+def fit_vectorizer(X: pd.Series, setup: dict = None) -> tuple:
+    """
+    Fits a copy of the setup's vectorizer on all texts.
+
+    Returns:
+    - tuple: The fitted vectorizer and the feature matrix of X.
+    """
+
+    if setup is None:
+        setup = training_and_eval_setup()
+
+    vectorizer = clone(setup['vectorizer'])
+    return vectorizer, vectorizer.fit_transform(X.to_numpy(dtype=object))
+
+
+def fit_final_model(X: pd.Series,
+                    y: pd.Series,
+                    setup: dict = None,
+                    results: pd.DataFrame = None,
+                    features: tuple = None
+                    ) -> tuple:
+    """
+    Fits the vectorizer and classifier on all data, e.g. to persist a model for scoring new reports.
+
+    Parameters:
+    - X (pd.Series): A pandas Series containing cleaned text values.
+    - y (pd.Series): A pandas Series containing the target values.
+    - setup (dict, optional): The components returned by training_and_eval_setup (created if not provided).
+    - results (pd.DataFrame, optional): The results of train_and_evaluate. The parameters selected in the most
+                                        outer folds are used. Default uses the classifier's own parameters.
+    - features (tuple, optional): The vectorizer already fitted on X and the feature matrix of X, as returned by
+                                  fit_vectorizer. Default fits the vectorizer here.
+
+    Returns:
+    - tuple: The fitted (vectorizer, classifier) and the label names of the classifier's classes_ (the categories of
+             a categorical target, whose codes the classifier predicts), or None if it predicts the values of y.
+    """
+
+    if setup is None:
+        setup = training_and_eval_setup()
+
+    params = {}
+    if results is not None and not results.empty:
+        selections = results['best_params'].map(lambda p: tuple(sorted(p.items())))
+        params = dict(selections.value_counts(sort=True).index[0])
+
+    vectorizer, matrix = features if features is not None else fit_vectorizer(X, setup)
+    # Trained on the same labels as the nested CV
+    labels, categories = _training_labels(y)
+    classifier = clone(setup['classifier']).set_params(**params)
+    classifier.fit(matrix, labels)
+    logging.info(f"Final model fitted on {len(X)} documents with parameters {params}")
+    return vectorizer, classifier, categories
+
+
+def compact_tradeoff(X: pd.Series,
+                     y: pd.Series,
+                     vectorizer_params: dict,
+                     seed: int = 42
+                     ) -> pd.DataFrame:
     """
-    
+    Compares the current representation (unconstrained float64 TF-IDF and the full forest) with the compact one
+    (pruned float32 TF-IDF and a CompactForest artifact). Both are trained with the classifier's default
+    parameters on the first outer CV split and evaluated on its test split.
+
+    Parameters:
+    - X (pd.Series): A pandas Series containing cleaned text values.
+    - y (pd.Series): A pandas Series containing the target values.
+    - vectorizer_params (dict): The compact TfidfVectorizer parameters (see compact_vectorizer_params).
+    - seed (int, optional): The random seed of the setup.
+
+    Returns:
+    - pd.DataFrame: One row per representation with the vocabulary size, the memory of the training matrix, the
+                    vectorization and training time, the test accuracy and weighted F1, and the size and load time
+                    of the saved pipeline (compact pipelines are saved compressed).
     """
 
-    
-    return None
\ No newline at end of file
+    texts = X.to_numpy(dtype=object)
+    labels, _ = _training_labels(y)
+    rows = []
+    for representation, params in (('current', {}), ('compact', vectorizer_params)):
+        setup = training_and_eval_setup(seed=seed, vectorizer_params=params)
+        train_idx, test_idx = next(setup['outer_cv'].split(texts))
+
+        start = time.perf_counter()
+        vectorizer, X_train, X_test = _vectorize_fold(setup['vectorizer'], texts[train_idx], texts[test_idx])
+        vectorize_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        classifier = clone(setup['classifier']).fit(X_train, labels[train_idx])
+        fit_time = time.perf_counter() - start
+
+        compress = 0
+        if representation == 'compact':
+            vectorizer, classifier = compact_pipeline(vectorizer, classifier)
+            compress = 3
+        y_pred = classifier.predict(X_test)
+        _, _, f1, _ = precision_recall_fscore_support(labels[test_idx], y_pred, average='weighted', zero_division=0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pipeline.joblib')
+            joblib.dump({'vectorizer': vectorizer, 'classifier': classifier}, path, compress=compress)
+            start = time.perf_counter()
+            joblib.load(path)
+            load_time = time.perf_counter() - start
+            artifact_bytes = os.path.getsize(path)
+
+        rows.append({'representation': representation,
+                     'vocabulary': len(vectorizer.vocabulary_),
+                     'matrix_mb': _matrix_nbytes(X_train) / 2 ** 20,
+                     'vectorize_seconds': vectorize_time,
+                     'fit_seconds': fit_time,
+                     'accuracy': accuracy_score(labels[test_idx], y_pred),
+                     'f1': f1,
+                     'artifact_mb': artifact_bytes / 2 ** 20,
+                     'load_seconds': load_time})
+
+    results = pd.DataFrame(rows)
+    current, compact = results.iloc[0], results.iloc[1]
+    logging.info(f"Compact representation: matrix {compact['matrix_mb']:.1f} MB (vs {current['matrix_mb']:.1f} MB), "
+                 f"artifact {compact['artifact_mb']:.1f} MB (vs {current['artifact_mb']:.1f} MB), "
+                 f"accuracy {compact['accuracy']:.3f} (vs {current['accuracy']:.3f}).")
+    return results
+
+
+def train_incremental(
+        chunk_source: Callable[[], Iterable[tuple]],
+        classes: list,
+        extractor: StreamingFeatureExtractor = None,
+        classifier = None
+        ) -> tuple:
+    """
+    Trains a classifier chunk by chunk with hashed features, so the full feature matrix is never held in memory.
+
+    If the extractor uses IDF weighting and has not been fitted, a first pass over the chunks accumulates the
+    document frequencies. A second pass transforms each chunk and updates the classifier with partial_fit.
+
+    Parameters:
+    - chunk_source (Callable): A function returning a fresh iterable of (texts, labels) chunks on each call, e.g.
+                               lambda: ((c[features], c[target]) for c in load_data(path, chunksize=n)).
+    - classes (list): All target classes (required by partial_fit on the first chunk).
+    - extractor (StreamingFeatureExtractor, optional): The feature extractor. Default is a new
+                                                       StreamingFeatureExtractor.
+    - classifier (optional): A classifier supporting partial_fit. Default is a logistic-loss SGDClassifier.
+
+    Returns:
+    - tuple: The fitted (extractor, classifier).
+
+    Raises:
+    - TypeError: If the classifier does not support partial_fit.
+    """
+
+    if extractor is None:
+        extractor = StreamingFeatureExtractor()
+    if classifier is None:
+        classifier = SGDClassifier(loss='log_loss', random_state=42)
+    if not hasattr(classifier, 'partial_fit'):
+        error_message = f"{type(classifier).__name__} does not support partial_fit."
+        logging.error(error_message)
+        raise TypeError(error_message)
+
+    # First pass: document frequencies for the IDF weights
+    if extractor.use_idf and not hasattr(extractor, 'document_frequency_'):
+        for texts, _ in chunk_source():
+            extractor.partial_fit(texts)
+        logging.info(f"Document frequencies accumulated from {extractor.n_documents_} documents.")
+
+    # Second pass: incremental training
+    n_documents = 0
+    for texts, labels in chunk_source():
+        classifier.partial_fit(extractor.transform(texts), np.asarray(labels), classes=classes)
+        n_documents += len(labels)
+    logging.info(f"Incrementally trained {type(classifier).__name__} on {n_documents} documents.")
+
+    return extractor, classifier
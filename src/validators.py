@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import logging
 import warnings
+from typing import Iterable, Union
 from pandas.api.types import infer_dtype
 from src.exceptions import DataIntegrityError
 
@@ -31,53 +33,220 @@ def check_type(
         raise TypeError(error_message)
     
 
-def check_data_imbalance(data: pd.Series, threshold: float = 0.1):
+def class_counts(data: pd.Series) -> pd.Series:
     """
-    Checks for imbalance in the target dataset and issues a warning if imbalance is detected.
+    Returns the number of occurrences of each value in data (excluding NaNs). Categorical data is counted from its
+    integer codes with np.bincount, and categories that do not occur are left out.
+    """
+
+    if isinstance(data.dtype, pd.CategoricalDtype):
+        codes = data.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(data.cat.categories))
+        return pd.Series(counts, index=data.cat.categories)[counts > 0]
+    return data.value_counts()
+
+
+def _imbalance_warning(smallest_proportion: float) -> str:
+    return (f"Warning: The dataset is highly imbalanced. "
+            f"The smallest class represents only {smallest_proportion:.2%} of the data. "
+            "Consider using techniques for handling imbalanced data.")
+
+
+def check_data_imbalance(data: Union[pd.Series, Iterable[pd.Series]], threshold: float = 0.1) -> dict:
+    """
+    Checks for imbalance in the target dataset and issues a warning if imbalance is detected. The class proportions
+    are those of validation_report, but the warning is issued whatever the data type.
 
     Parameters:
-    - data (pd.Series): The target dataset as a pandas Series.
+    - data (pd.Series or Iterable[pd.Series]): The target dataset, whole or in chunks.
     - threshold (float): The threshold for determining imbalance. Default is 0.1, representing 10%.
                          If the proportion of the smallest class is less than this threshold,
                          a warning is issued.
+
+    Returns:
+    - dict: The validation report (see validation_report).
     """
-    # Calculate the proportion of each class
-    class_proportions = data.value_counts(normalize=True)
-    
-    # Find the smallest class proportion
-    smallest_class_proportion = class_proportions.min()
-    
-    # Check if the smallest class proportion is below the threshold
-    if smallest_class_proportion < threshold:
-        warning_message = (f"Warning: The dataset is highly imbalanced. "
-                           f"The smallest class represents only {smallest_class_proportion:.2%} of the data. "
-                           "Consider using techniques for handling imbalanced data.")
-        warnings.warn(warning_message)
 
+    report = validation_report(data, threshold=threshold)
+    if report['smallest_class_proportion'] < threshold:
+        warnings.warn(_imbalance_warning(report['smallest_class_proportion']))
+    return report
+
+
+class IntegrityAccumulator:
+    """
+    Accumulates the statistics used by the integrity and imbalance checks in a single pass per chunk: the class
+    counts (one value_counts, or np.bincount of the codes for categorical data), the number of missing values and
+    the inferred type of the distinct values. Accumulators built on different chunks can be merged.
+
+    With sample_size, only a uniform random sample of at most sample_size rows is checked. Each row is given a
+    random key and the rows with the smallest keys are kept, so samples from different chunks (or accumulators
+    with different seeds) can be merged without bias.
+
+    Parameters:
+    - sample_size (int, optional): The maximum number of rows checked. Default checks every row.
+    - seed (int, optional): The random seed used to draw the sample.
+    """
+
+    def __init__(self, sample_size: int = None, seed: int = 42):
+        if sample_size is not None and (not isinstance(sample_size, int) or sample_size < 1):
+            raise ValueError("sample_size must be a positive integer.")
+        self.sample_size = sample_size
+        self.n_rows = 0
+        self.n_missing = 0
+        self.counts = pd.Series(dtype='int64')
+        self.data_types = set()
+        self._rng = np.random.default_rng(seed)
+        self._sample_keys = np.empty(0)
+        self._sample_values = pd.Series(dtype=object)
+
+    def update(self, data: pd.Series):
+        """Adds a chunk of values to the accumulator."""
+
+        self.n_rows += len(data)
+        if self.sample_size is None:
+            self._count(data)
+            return
+
+        keys = self._rng.random(len(data))
+        if len(self._sample_keys) >= self.sample_size:
+            candidates = keys < self._sample_keys.max()
+            data, keys = data[candidates], keys[candidates]
+        self._add_sample(keys, data)
+
+    def merge(self, other: 'IntegrityAccumulator'):
+        """Combines the statistics (or sample) of another accumulator into this one."""
+
+        if (self.sample_size is None) != (other.sample_size is None):
+            raise ValueError("Cannot merge a sampled accumulator with an exact one.")
+        self.n_rows += other.n_rows
+        if self.sample_size is None:
+            self.n_missing += other.n_missing
+            self.counts = self.counts.add(other.counts, fill_value=0).astype('int64')
+            self.data_types |= other.data_types
+        else:
+            self._add_sample(other._sample_keys, other._sample_values)
 
-def data_integrity_check(data: pd.Series):
+    def _count(self, data: pd.Series):
+        counts = class_counts(data)
+        self.n_missing += len(data) - int(counts.sum())
+        self.counts = self.counts.add(counts, fill_value=0).astype('int64')
+        if len(counts):
+            self.data_types.add(infer_dtype(counts.index))
+
+    def _add_sample(self, keys: np.ndarray, values: pd.Series):
+        keys = np.concatenate([self._sample_keys, keys])
+        values = pd.concat([self._sample_values, values.astype(object)], ignore_index=True)
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size - 1)[:self.sample_size]
+            keys, values = keys[keep], values.iloc[keep].reset_index(drop=True)
+        self._sample_keys, self._sample_values = keys, values
+
+    def report(self, threshold: float = 0.1) -> dict:
+        """
+        Returns the validation report.
+
+        Parameters:
+        - threshold (float): The smallest class proportion below which the data is flagged as imbalanced.
+
+        Returns:
+        - dict: The rows seen ('n_rows') and checked ('n_checked'), missing values, the inferred data type, the
+                count of each class, the smallest class proportion, the errors (non-string or identical values) and
+                warnings (imbalance) found, and whether the checks passed.
+        """
+
+        if self.sample_size is None:
+            stats = self
+        else:
+            stats = IntegrityAccumulator()
+            stats.update(self._sample_values)
+        n_checked = stats.n_rows
+
+        data_types = stats.data_types
+        if not data_types:
+            data_type = 'empty'
+        elif len(data_types) == 1:
+            data_type = next(iter(data_types))
+        else:
+            data_type = 'mixed'
+
+        proportions = stats.counts / stats.counts.sum() if len(stats.counts) else stats.counts.astype(float)
+        smallest_proportion = float(proportions.min()) if len(proportions) else np.nan
+
+        errors = []
+        warning_messages = []
+        if data_type != 'string':
+            errors.append(f'Data is of type {data_type}. Data type should be "string".')
+        elif len(stats.counts) == 1:
+            errors.append('Values in dataset appear identical.')
+        elif smallest_proportion < threshold:
+            warning_messages.append(_imbalance_warning(smallest_proportion))
+
+        return {
+            'n_rows': self.n_rows,
+            'n_checked': n_checked,
+            'sampled': self.sample_size is not None and n_checked < self.n_rows,
+            'n_missing': stats.n_missing,
+            'data_type': data_type,
+            'n_classes': len(stats.counts),
+            'class_counts': stats.counts.sort_values(ascending=False).to_dict(),
+            'smallest_class_proportion': smallest_proportion,
+            'errors': errors,
+            'warnings': warning_messages,
+            'passed': not errors
+        }
+
+
+def validation_report(
+        data: Union[pd.Series, Iterable[pd.Series]],
+        threshold: float = 0.1,
+        sample_size: int = None,
+        seed: int = 42
+        ) -> dict:
+    """
+    Computes the integrity and imbalance statistics of a Series, or of chunks of a Series, in one pass without
+    raising or warning (see IntegrityAccumulator.report for the contents of the report).
+
+    Parameters:
+    - data (pd.Series or Iterable[pd.Series]): The data to be checked, whole or in chunks.
+    - threshold (float): The smallest class proportion below which the data is flagged as imbalanced.
+    - sample_size (int, optional): If given, only a uniform random sample of at most this many rows is checked.
+    - seed (int, optional): The random seed used to draw the sample.
+    """
+
+    accumulator = IntegrityAccumulator(sample_size=sample_size, seed=seed)
+    for chunk in ([data] if isinstance(data, pd.Series) else data):
+        accumulator.update(chunk)
+    return accumulator.report(threshold=threshold)
+
+
+def data_integrity_check(
+        data: Union[pd.Series, Iterable[pd.Series]],
+        sample_size: int = None
+        ) -> dict:
     """
     Performs data integrity checks on a pandas Series and raises a custom error if violated.
 
     Parameters:
-    - data (pd.Series): The data to be checked.
+    - data (pd.Series or Iterable[pd.Series]): The data to be checked, whole or in chunks. For categorical data
+                                               the checks run on the codes rather than on every value.
+    - sample_size (int, optional): If given, only a uniform random sample of at most this many rows is checked
+                                   (faster, but a rare class or value of the wrong type may be missed).
+
+    Returns:
+    - dict: The validation report (see validation_report).
 
     Raises:
-    - DataIntegrityError: If data type other than 'string' is found in 'data'.
+    - DataIntegrityError: If data type other than 'string' is found in 'data', or all values are identical.
     """
 
-    # Check data type equals string
-    data_type = infer_dtype(data)
-    if data_type != 'string':
-        error_message = f'Data is of type {data_type}. Data type should be "string".'
-        logging.error(error_message)
-        raise DataIntegrityError
-    
-    # Check for single values
-    if data.nunique() == 1:
-        error_message = f'Values in dataset appear identical.'
+    report = validation_report(data, sample_size=sample_size)
+    for error_message in report['errors']:
         logging.error(error_message)
-        raise DataIntegrityError
-    
-    # Check for potential data imbalance issues
-    check_data_imbalance(data)
\ No newline at end of file
+    if report['errors']:
+        raise DataIntegrityError(report['errors'][0])
+
+    # Warn about potential data imbalance issues
+    for warning_message in report['warnings']:
+        warnings.warn(warning_message)
+    return report
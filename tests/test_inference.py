@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from src.inference import predict_texts
+from src.text_preprocessing import text_cleaning
+
+
+def test_predict_texts_decodes_label_codes():
+    texts = pd.Series(['burglary window smashed', 'window smashed overnight',
+                       'vehicle stolen driveway', 'vehicle stolen car park'] * 5)
+    target = pd.Categorical(['burglary', 'burglary', 'vehicle theft', 'vehicle theft'] * 5)
+    vectorizer = TfidfVectorizer().fit(text_cleaning(texts))
+    classifier = LogisticRegression().fit(vectorizer.transform(text_cleaning(texts)), target.codes)
+    pipeline = {'vectorizer': vectorizer, 'classifier': classifier, 'labels': target.categories.to_numpy(),
+                'cleaning_options': {}}
+
+    predictions = predict_texts(pipeline, pd.Series(['stolen vehicle', 'smashed window'], index=[7, 9]))
+
+    assert predictions['prediction'].tolist() == ['vehicle theft', 'burglary']
+    assert list(predictions.columns) == ['prediction', 'proba_burglary', 'proba_vehicle theft']
+    np.testing.assert_array_equal(classifier.classes_, [0, 1])
+    assert predictions.index.tolist() == [7, 9]
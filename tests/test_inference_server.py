@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+from src.inference_server import InferenceServer, MicroBatcher
+
+
+async def _request(port: int, method: str, path: str, body: bytes = b'', headers: dict = None) -> tuple:
+    """Sends one HTTP request to the local server and returns the response status and JSON payload."""
+
+    headers = {'Content-Length': str(len(body)), **(headers or {})}
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n".encode('latin-1')
+                 + ''.join(f"{name}: {value}\r\n" for name, value in headers.items()).encode('latin-1')
+                 + b'\r\n' + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+def _run_server(scenario, max_batch_size: int = 16, max_wait_ms: float = 200.0, max_body_bytes: int = 10_000):
+    """Serves a MicroBatcher with an upper-casing predict function on a free localhost port and runs scenario."""
+
+    batch_sizes = []
+
+    def predict(texts):
+        batch_sizes.append(len(texts))
+        time.sleep(0.01)
+        return [{'prediction': text.upper()} for text in texts]
+
+    async def main():
+        server = InferenceServer(MicroBatcher(predict, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms),
+                                 port=0, max_body_bytes=max_body_bytes)
+        await server.start()
+        try:
+            return await scenario(server.port)
+        finally:
+            await server.stop()
+
+    return asyncio.run(main()), batch_sizes
+
+
+def test_concurrent_requests_are_batched():
+    async def scenario(port):
+        texts = [f"report {i}" for i in range(100)]
+        responses = await asyncio.gather(*(
+            _request(port, 'POST', '/predict', json.dumps({'text': text}).encode('utf-8')) for text in texts
+            ))
+        metrics = await _request(port, 'GET', '/metrics')
+        return texts, responses, metrics
+
+    (texts, responses, metrics), batch_sizes = _run_server(scenario, max_batch_size=16)
+
+    assert [status for status, _ in responses] == [200] * 100
+    assert [payload['predictions'] for _, payload in responses] == [[{'prediction': text.upper()}] for text in texts]
+    assert sum(batch_sizes) == 100
+    assert max(batch_sizes) == 16
+
+    status, payload = metrics
+    assert status == 200
+    assert payload['requests'] == 100
+    assert payload['texts'] == 100
+    assert payload['batches'] == len(batch_sizes)
+    assert payload['mean_batch_size'] > 1
+    assert payload['queue_depth'] == 0
+    assert set(payload['latency_ms']) == {'p50', 'p90', 'p95', 'p99'}
+
+
+def test_invalid_requests_are_rejected():
+    async def scenario(port):
+        return [
+            await _request(port, 'POST', '/predict', headers={'Content-Length': 'abc'}),
+            await _request(port, 'POST', '/predict', headers={'Content-Length': '-5'}),
+            await _request(port, 'POST', '/predict', headers={'Content-Length': '1000'}),
+            await _request(port, 'POST', '/predict', b'not json'),
+            await _request(port, 'POST', '/predict', json.dumps({'texts': [1, 2]}).encode('utf-8')),
+            ]
+
+    responses, batch_sizes = _run_server(scenario, max_body_bytes=100)
+
+    assert [status for status, _ in responses] == [400, 400, 413, 400, 400]
+    assert batch_sizes == []
+
+
+def test_batch_with_missing_results_fails_instead_of_hanging():
+    async def main():
+        batcher = MicroBatcher(lambda texts: [{'prediction': 'x'}] * (len(texts) - 1), max_wait_ms=50.0)
+        server = InferenceServer(batcher, port=0)
+        await server.start()
+        try:
+            return await asyncio.wait_for(asyncio.gather(*(
+                _request(server.port, 'POST', '/predict', json.dumps({'text': text}).encode('utf-8'))
+                for text in ('a', 'b', 'c')
+                )), timeout=10)
+        finally:
+            await server.stop()
+
+    responses = asyncio.run(main())
+
+    assert [status for status, _ in responses] == [500] * 3
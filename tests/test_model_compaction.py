@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.tree import DecisionTreeClassifier
+from src.model_compaction import CompactForest
+
+
+def _corpus(n_documents: int = 300, seed: int = 0) -> tuple:
+    """Returns float32 TF-IDF features of random documents and three labels that depend on their words."""
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"word{i}" for i in range(200)])
+    documents = [' '.join(rng.choice(vocabulary, size=rng.integers(5, 40))) for _ in range(n_documents)]
+    X = TfidfVectorizer(dtype=np.float32).fit_transform(documents)
+    y = np.asarray(X[:, :3].argmax(axis=1)).ravel()
+    return X, y
+
+
+def _assert_same_predictions(forest, compact, X):
+    expected = forest.predict_proba(X)
+    probabilities = compact.predict_proba(X)
+    np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+
+    # Classes can only differ where float32 rounding breaks a tie
+    top_two = np.sort(expected, axis=1)[:, -2:]
+    clear = top_two[:, 1] - top_two[:, 0] > 1e-5
+    np.testing.assert_array_equal(compact.predict(X)[clear], forest.predict(X)[clear])
+
+
+@pytest.mark.parametrize('max_depth', [None, 3])
+def test_compact_forest_matches_random_forest(max_depth):
+    X, y = _corpus()
+    forest = RandomForestClassifier(n_estimators=25, max_depth=max_depth, random_state=0).fit(X, y)
+
+    compact = CompactForest(forest, batch_size=64)
+
+    np.testing.assert_array_equal(compact.classes_, forest.classes_)
+    _assert_same_predictions(forest, compact, X)
+    _assert_same_predictions(forest, compact, _corpus(seed=1)[0])
+
+
+def test_compact_forest_handles_single_leaf_trees():
+    X, y = _corpus()
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    # Trees that cannot split are a single leaf
+    forest.estimators_ += [DecisionTreeClassifier(min_samples_split=X.shape[0] + 1, random_state=seed).fit(X, y)
+                           for seed in range(3)]
+    assert forest.estimators_[-1].tree_.node_count == 1
+
+    _assert_same_predictions(forest, CompactForest(forest), X)
+
+    leaves_only = RandomForestClassifier(n_estimators=5, min_samples_split=X.shape[0] + 1, random_state=0).fit(X, y)
+    compact = CompactForest(leaves_only)
+    assert len(compact.features_used_) == 0
+    _assert_same_predictions(leaves_only, compact, X)
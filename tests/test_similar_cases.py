@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.similar_cases import SimilarCaseIndex
+
+
+def _reports(n_reports: int = 60, seed: int = 0) -> pd.Series:
+    """Returns random cleaned reports indexed by report id."""
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"word{i}" for i in range(100)])
+    return pd.Series([' '.join(rng.choice(vocabulary, size=rng.integers(10, 30))) for _ in range(n_reports)],
+                     index=[f"case{i}" for i in range(n_reports)])
+
+
+def test_approximate_search_equals_brute_force_without_pruning():
+    reports = _reports()
+    # Single-bit tables split the reports in two, and with 32 tables every pair shares a bucket in at least one
+    index = SimilarCaseIndex(n_tables=32, n_bits=1).build(reports)
+
+    approximate = index.search(reports, k=5).sort_values(['query', 'rank'], ignore_index=True)
+    exact = index.search(reports, k=5, exact=True).sort_values(['query', 'rank'], ignore_index=True)
+
+    pd.testing.assert_series_equal(approximate['query'], exact['query'])
+    pd.testing.assert_series_equal(approximate['id'], exact['id'])
+    np.testing.assert_allclose(approximate['similarity'], exact['similarity'], rtol=1e-5)
+    assert (exact.loc[exact['rank'] == 0, 'id'] == exact.loc[exact['rank'] == 0, 'query']).all()
+
+    report = index.evaluate(reports, k=5, batch_size=16)
+    assert report['recall_at_k'] == 1.0
+    assert report['queries'] == len(reports)
+
+
+def test_add_gives_the_same_tables_as_build():
+    reports = _reports()
+    vectorizer = TfidfVectorizer().fit(reports)
+
+    built = SimilarCaseIndex(vectorizer=vectorizer, n_tables=4, n_bits=6).build(reports)
+    added = SimilarCaseIndex(vectorizer=vectorizer, n_tables=4, n_bits=6).build(reports.iloc[:35])
+    added.add(reports.iloc[35:50]).add(reports.iloc[50:])
+
+    np.testing.assert_array_equal(added.sorted_codes_, built.sorted_codes_)
+    np.testing.assert_array_equal(added.order_, built.order_)
+    np.testing.assert_array_equal(added.ids_, built.ids_)
+    np.testing.assert_allclose(added.vectors_.toarray(), built.vectors_.toarray())
+
+
+def test_evaluate_without_queries():
+    index = SimilarCaseIndex().build(_reports())
+
+    report = index.evaluate(pd.Series([], dtype=object))
+
+    assert report['queries'] == 0
+    assert np.isnan(report['approximate_ms_per_query'])
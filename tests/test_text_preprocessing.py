@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.text_preprocessing import basic_cleaning
+
+pytest.importorskip('pyarrow')
+
+
+def test_arrow_engine_matches_python_engine():
+    data = pd.Series([
+        'The suspect entered at 23:40, removing a laptop (value £350)!',
+        'Café owner’s window — smashed; No. 14 High Street.',
+        'Ωmega Straße: ½ price ²nd ⅷ',
+        '被害者 reported the offence',
+        np.nan,
+        None,
+        '',
+        'tab\tseparated em-space nbsp'
+        ])
+
+    python_output = basic_cleaning(data, engine='python')
+    arrow_output = basic_cleaning(data, engine='arrow')
+
+    pd.testing.assert_series_equal(arrow_output, python_output)
+
+
+def test_arrow_engine_keeps_missing_rows_missing():
+    data = pd.Series([np.nan, 'Burglary, at No. 5!', np.nan])
+
+    output = basic_cleaning(data, engine='arrow')
+
+    assert output.isna().tolist() == [True, False, True]
+    assert output[1] == 'burglary at no '